@@ -1,10 +1,14 @@
 import gym, gym.spaces, gym.utils, gym.utils.seeding
 import numpy as np
-from battleship import Board 
+from battleship import Board, BitBoard, SparseBoard, BatchBoard 
 from battleship.static_board_v1 import ship_config 
 
 BOARD_DIM = 10 
 
+# Above this board_dim the env plays on a SparseBoard (ship cells only) instead 
+#   of a BitBoard, and observations default to int8 
+SPARSE_DIM = 32 
+
 
 class BattleshipEnvClass(gym.Env):
     """ BattleshipEnvClass 
@@ -12,27 +16,48 @@ class BattleshipEnvClass(gym.Env):
         action_space is a index representing grid coordinate to probe next 
         obs_space is the entire (n x n) grid with discrete values (-1, 0, 1) 
 
+        action_masks() and info["action_mask"] flag the actions not taken yet 
+        this episode, for masked agents (e.g. sb3_contrib MaskablePPO).  Like the 
+        observation, the mask is updated in place by step() and reset(). 
+
+        Large boards (board_dim > SPARSE_DIM, e.g. 100 or 1000) are played on a 
+        SparseBoard, so each step is O(1) whatever the size, and the observation 
+        is int8: one byte per cell is the only per-cell memory of the env. 
+        ship_config='scaled' puts proportionally many ships on them. 
+
     """
-    def __init__(self):
+    def __init__(self, board_dim=BOARD_DIM, ship_config='default', obs_dtype=None):
+        """ board_dim - dimension of the square grid 
+              ship_config - passed to the board, see SparseBoard 
+              obs_dtype - dtype of the observations, np.int32 up to SPARSE_DIM and np.int8 above by default 
+        """
         
-        self.board_dim = BOARD_DIM  
+        self.board_dim = board_dim  
+        self.ship_config = ship_config 
+        if obs_dtype is None: 
+            obs_dtype = np.int32 if board_dim <= SPARSE_DIM else np.int8 
 
         # Action space is index of action for grid.flatten() 
-        #   get i, j with i, j = (action % BOARD_DIM, action // BOARD_DIM)
-        self.action_space = gym.spaces.Discrete(BOARD_DIM * BOARD_DIM)
+        #   get i, j with i, j = (action % board_dim, action // board_dim)
+        self.action_space = gym.spaces.Discrete(board_dim * board_dim)
 
         # Observation space is an integer array that summarizes knowledge of each  
         #    grid block according to:   {0: unknown, 1: hit, -1: miss}
         self.observation_space = gym.spaces.Box(low=-1, high=1, 
-            shape=(BOARD_DIM, BOARD_DIM), dtype=np.int32)        
+            shape=(board_dim, board_dim), dtype=obs_dtype)        
+
+        # Preallocated, reset() clears them in place 
+        self.state = np.zeros((self.board_dim, self.board_dim), dtype=obs_dtype) 
+        self.action_mask = np.ones(self.board_dim * self.board_dim, dtype=bool) 
+        self.board = None 
+        self._own_board = False 
         
         self.reset()
     
 
     def step(self, action):
 
-        state_prev = np.copy(self.state) 
-        action_coord = (action % BOARD_DIM, action // BOARD_DIM)
+        action_coord = (action % self.board_dim, action // self.board_dim)
 
         ####################
         # ADVANCE ENVIRONMENT -- Produce next state, check done condition   
@@ -46,6 +71,7 @@ class BattleshipEnvClass(gym.Env):
             raise ValueError("Invalid return from board.torpedo(), f{hit}")
 
         self.done = self.board.check_gameover()
+        self.action_mask[action] = False 
 
 
         ####################
@@ -59,7 +85,7 @@ class BattleshipEnvClass(gym.Env):
 
 
 
-        info = {}
+        info = {"action_mask": self.action_mask}
         return self.state, reward, self.done, info
     
     def render(self):
@@ -69,15 +95,30 @@ class BattleshipEnvClass(gym.Env):
     
     def reset(self):
 
-        self.board = Board(dim=self.board_dim, ship_config='default', vis=False, playmode=False)
+        # Headless BitBoard, same game as Board(vis=False) at a fraction of the cost 
+        #   SparseBoard on large grids.  The env's own board starts a new game in place 
+        if self._own_board: 
+            self.board.reset() 
+        else: 
+            board_cls = BitBoard if self.board_dim <= SPARSE_DIM else SparseBoard 
+            self.board = board_cls(dim=self.board_dim, ship_config=self.ship_config)
+
+            # Uncomment this for a frozen board state between training iterations 
+#             self.board = BitBoard(dim=self.board_dim, ship_config=ship_config)
 
-        # Uncomment this for a frozen board state between training iterations 
-#         self.board = Board(dim=self.board_dim, ship_config=ship_config, vis=False, playmode=False)
+            self._own_board = True 
 
-        self.state = np.zeros((self.board_dim, self.board_dim), dtype=np.int32) 
+        self.state[:] = 0 
+        self.action_mask[:] = True 
         self.done = False 
 
         return self.state
+
+
+    def action_masks(self): 
+        """ Bool array over the actions, False for cells already probed this episode 
+        """
+        return self.action_mask
         
     
     def seed(self, seed=None):
@@ -86,4 +127,94 @@ class BattleshipEnvClass(gym.Env):
 
 
     def _overwrite_board(self, board): 
-        self.board = board 
\ No newline at end of file
+        self.board = board
+        self._own_board = False 
+
+
+class BattleshipVecEnv(gym.vector.VectorEnv):
+    """ BattleshipVecEnv 
+
+        num_envs copies of BattleshipEnvClass stepped in lockstep on a BatchBoard. 
+        Same actions, observations and rewards as BattleshipEnvClass, batched 
+        along the first axis.  Finished games are reset automatically as in 
+        gym.vector.SyncVectorEnv, their last observation is in 
+        info["terminal_observation"].  action_masks() is the (num_envs, n * n) 
+        batch of BattleshipEnvClass.action_masks(). 
+
+        The boards are dense (num_envs, n, n) arrays: BatchBoard raises a ValueError 
+        above n = batch_board.MAX_DIM (256) or num_envs * n * n = batch_board.MAX_CELLS. 
+
+    """
+    def __init__(self, num_envs=64, board_dim=BOARD_DIM, ship_config='default', obs_dtype=None):
+
+        self.board_dim = board_dim 
+        if obs_dtype is None: 
+            obs_dtype = np.int32 if board_dim <= SPARSE_DIM else np.int8 
+
+        super().__init__(num_envs, 
+            gym.spaces.Box(low=-1, high=1, shape=(board_dim, board_dim), dtype=obs_dtype), 
+            gym.spaces.Discrete(board_dim * board_dim)) 
+
+        self.board = BatchBoard(num_envs, dim=self.board_dim, ship_config=ship_config) 
+        self.state = np.zeros((num_envs, self.board_dim, self.board_dim), dtype=obs_dtype) 
+        self.action_mask = np.ones((num_envs, self.board_dim * self.board_dim), dtype=bool) 
+        self._rows = np.arange(num_envs) 
+        self._actions = None 
+
+
+    def reset_wait(self, **kwargs):
+
+        self.board.reset() 
+        self.state[:] = 0 
+        self.action_mask[:] = True 
+
+        return self.state.copy() 
+
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions) 
+
+
+    def step_wait(self):
+
+        actions = self._actions 
+        action_coords = np.stack([actions % self.board_dim, actions // self.board_dim], axis=1) 
+
+        ####################
+        # ADVANCE ENVIRONMENT 
+        hit = self.board.torpedo(action_coords) 
+        self.state[self._rows, action_coords[:, 0], action_coords[:, 1]] = 2 * hit - 1 
+
+        dones = self.board.check_gameover() 
+        self.action_mask[self._rows, actions] = False 
+
+
+        ####################
+        # REWARD CALCULATION, as in BattleshipEnvClass.step() 
+
+        rewards = -1 + 2 * hit 
+
+
+        infos = [{} for _ in range(self.num_envs)] 
+        observations = self.state.copy() 
+        finished = np.flatnonzero(dones) 
+        if len(finished): 
+            for b in finished: 
+                infos[b]["terminal_observation"] = observations[b].copy() 
+            self.board.reset(finished) 
+            self.state[finished] = 0 
+            self.action_mask[finished] = True 
+            observations[finished] = 0 
+
+        return observations, rewards, dones, infos 
+
+
+    def action_masks(self): 
+        """ (num_envs, n * n) bool, False for cells already probed in each game 
+        """
+        return self.action_mask
+
+
+    def seed(self, seed=None):
+        self.np_random, seed = gym.utils.seeding.np_random(seed)
+        return [seed]
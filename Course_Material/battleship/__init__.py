@@ -1,5 +1,11 @@
 from .ship import Ship, Direction 
 from .board import Board 
+from .bitboard import BitBoard 
+from .sparse_board import SparseBoard 
+from .batch_board import BatchBoard 
+from .sampler import UnprobedSampler, BatchUnprobedSampler 
 from .trivial_agent import TrivialAgent 
 from .less_trivial_agent import LessTrivialAgent 
+from .density_agent import DensityAgent 
 from .rl_agent import RLAgent 
+from .batch_rl_agent import BatchRLAgent 
@@ -0,0 +1,154 @@
+""" BatchBoard
+
+B games of Battleship played in lockstep, for vectorized environments.
+"""
+
+import numpy as np
+from .ship import Ship
+from .sparse_board import SparseBoard
+from .placement import resolve_fleet, sample_layouts
+
+# BatchBoard is dense: the grids hold n_boards * dim * dim int32 and random
+# layouts come from placement tables of O(dim * dim) placements per ship size
+MAX_DIM = 256
+MAX_CELLS = 1 << 26
+
+
+class BatchBoard():
+    """ BatchBoard object.  B Boards stored as stacked arrays, headless.
+
+        Attributes:
+        - n_boards : int  -- number of games B
+        - dim : int  -- dimension of square boards
+        - grid : nparray -- (B, dim, dim) int32, same encoding as Board.grid
+                         -- 0 for ocean, +Z for ship locations, -Z for hit ships
+        - life_points : nparray -- (B, n_ships) int32 life left of each ship
+        - lives_left : nparray -- (B,) int32 sum of life_points
+        - torpedos_used : nparray -- (B,) int64 torpedos fired in each game
+        - sunk : nparray -- (B,) bool, did the last torpedo sink a ship
+
+        Behaviors:
+        - torpedo(batch_coords : (B, 2) ints, rows)  -- one torpedo per game, or per game in rows
+        - score() -- return self.torpedos_used
+        - check_gameover() -- (B,) bool, all boats sunken
+        - ships_afloat_count() --  (B,) ships not sunk and (B,) total lives left
+        - reset(indices) -- new random games for the given boards
+    """
+
+    def __init__(self, n_boards:int, dim:int=10, ship_config='default'):
+        """ Initializes B game boards
+              n_boards - number of games B
+              dim - dimension of square grid
+              ship_config - 'default' for standard ship configuration and random placement.
+                  'scaled' or a list of (name, size) pairs for other fleets, as in SparseBoard.
+                  Also accepts a list of Ship objects, used for every game.
+        """
+
+        if dim > MAX_DIM or n_boards * dim * dim > MAX_CELLS:
+            raise ValueError(f"{n_boards} boards of {dim} x {dim} are too large for BatchBoard "
+                             f"(dim up to {MAX_DIM}, n_boards * dim * dim up to {MAX_CELLS}), "
+                             f"use SparseBoard for large boards")
+
+        self.n_boards = n_boards
+        self.dim = dim
+        self.ship_config = ship_config
+
+        # Sizes of the ships placed at random, None for preset ships
+        fleet = resolve_fleet(ship_config, dim)
+        self._sizes = None if fleet is None else [size for _, size in fleet]
+
+        n_ships = len(self._new_board().ships) if fleet is None else len(fleet)
+        self.grid = np.zeros((n_boards, dim, dim), dtype=np.int32)
+        self.life_points = np.zeros((n_boards, n_ships), dtype=np.int32)
+        self.lives_left = np.zeros(n_boards, dtype=np.int32)
+        self.torpedos_used = np.zeros(n_boards, dtype=np.int64)
+        self.sunk = np.zeros(n_boards, dtype=bool)
+
+        self._rows = np.arange(n_boards)
+        self.reset()
+
+
+
+    ##################
+    # Public behaviors
+
+    def torpedo(self, batch_coords, rows=None):
+        """ Launch one attack per game, batch_coords is (B, 2) of (i, j).
+            With rows, only the games in rows fire, batch_coords is then (len(rows), 2).
+
+            Returns (B,) or (len(rows),) int32, 0 for miss and 1 for hit.
+            Hitting a location already torpedo'd is a miss.
+            Coordinates must lie on the grid and rows must not repeat.
+        """
+
+        rows = self._rows if rows is None else np.asarray(rows)
+        batch_coords = np.asarray(batch_coords)
+        i, j = batch_coords[:, 0], batch_coords[:, 1]
+        if (batch_coords < 0).any() or (batch_coords >= self.dim).any():
+            raise ValueError("Provided coordinates are invalid")
+
+        self.torpedos_used[rows] += 1
+
+        cell = self.grid[rows, i, j]
+        hit = cell > 0
+
+        # flip hit cells, one torpedo per game so there are no repeated indices
+        rows = rows[hit]
+        ship = cell[hit] - 1
+        self.grid[rows, i[hit], j[hit]] = -cell[hit]
+        self.life_points[rows, ship] -= 1
+        self.lives_left[rows] -= 1
+
+        self.sunk[:] = False
+        self.sunk[rows] = self.life_points[rows, ship] == 0
+
+        return hit.astype(np.int32)
+
+
+    def score(self):
+        """ Returns (B,) torpedos used.  Essentially a score on the games
+        """
+        return self.torpedos_used
+
+
+    def check_gameover(self):
+        """ Check gameover condition (all ships sunk) of every game.
+        """
+        return self.lives_left == 0
+
+
+    def ships_afloat_count(self):
+        """ Returns (B,) number of ships remaining on each board and (B,) total lives left
+        """
+        return (self.life_points > 0).sum(axis=1), self.lives_left.copy()
+
+
+    def reset(self, indices=None):
+        """ Starts new games on the boards in indices, all boards by default
+        """
+
+        indices = self._rows if indices is None else np.asarray(indices)
+        if self._sizes is not None:
+            _, self.grid[indices] = sample_layouts(len(indices), self.dim, self._sizes)
+            self.life_points[indices] = self._sizes
+        else:
+            board = self._new_board()
+            self.grid[indices] = board.grid
+            self.life_points[indices] = [ship.life_points for ship in board.ships]
+
+        self.lives_left[indices] = self.life_points[indices].sum(axis=1)
+        self.torpedos_used[indices] = 0
+        self.sunk[indices] = False
+
+
+
+    ##################
+    # Private behaviors
+
+    def _new_board(self):
+        """ One game in the layout given by ship_config
+        """
+        if isinstance(self.ship_config[0], Ship):
+            return SparseBoard(dim=self.dim, ship_config=self.ship_config)
+
+        raise ValueError("Input ship_config into BatchBoard() is not valid")
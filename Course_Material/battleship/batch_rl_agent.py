@@ -0,0 +1,92 @@
+""" Batched RL Agent plays many boards per model call, for evaluating trained models.
+"""
+
+import numpy as np
+from battleship import BatchBoard
+
+
+class BatchRLAgent():
+    """ Plays n_games with a model trained on BattleshipEnvClass, n_boards at a time.
+
+        All unfinished boards are advanced together: one model.predict() on
+        the stacked observations, one BatchBoard.torpedo() for the actions.
+        A finished game is retired, its score recorded and its slot reused
+        for the next game until n_games have started.
+
+        Same observations and rewards as RLAgent, which steps BattleshipEnvClass.
+    """
+
+    def __init__(self, model, n_boards=256, dim=10, ship_config='default',
+                 deterministic=False, use_masks=False, max_shots=None):
+        """ model - anything with model.predict(obs) -> (actions, states), e.g. stable_baselines3
+              n_boards - games played concurrently, on a dense BatchBoard, so dim is limited to batch_board.MAX_DIM
+              deterministic - passed to model.predict()
+              use_masks - pass action_masks of the unprobed cells to model.predict(), for sb3_contrib MaskablePPO
+              max_shots - games still running after max_shots torpedos are retired unfinished
+        """
+
+        self.model = model
+        self.n_boards = n_boards
+        self.dim = dim
+        self.deterministic = deterministic
+        self.use_masks = use_masks
+        self.max_shots = max_shots
+
+        self.board = BatchBoard(n_boards, dim=dim, ship_config=ship_config)
+        self.obs = np.zeros((n_boards, dim, dim), dtype=np.int32)
+        self.rewards = np.zeros(n_boards, dtype=np.int64)
+
+
+    def play_until_completion(self, n_games=1000, debug=False):
+        """ Plays n_games.  Returns their scores (torpedo counts) and episode rewards,
+            in the order the games finished.  Games cut by max_shots score max_shots.
+        """
+
+        slots = min(self.n_boards, n_games)
+        active = np.arange(slots)
+        started = slots
+        self.board.reset(active)
+        self.obs[active] = 0
+        self.rewards[active] = 0
+
+        scores, episode_rewards = [], []
+        calls = 0
+
+        while len(active):
+
+            obs = self.obs[active]
+            if self.use_masks:
+                masks = obs.transpose(0, 2, 1).reshape(len(active), -1) == 0
+                actions, _states = self.model.predict(obs, deterministic=self.deterministic, action_masks=masks)
+            else:
+                actions, _states = self.model.predict(obs, deterministic=self.deterministic)
+            calls += 1
+
+            # Action index as in BattleshipEnvClass: i, j = (action % dim, action // dim)
+            actions = np.asarray(actions).reshape(-1)
+            i, j = actions % self.dim, actions // self.dim
+            hit = self.board.torpedo(np.stack([i, j], axis=1), rows=active)
+            self.obs[active, i, j] = 2 * hit - 1
+            self.rewards[active] += 2 * hit - 1
+
+            done = self.board.check_gameover()[active]
+            if self.max_shots is not None:
+                done |= self.board.torpedos_used[active] >= self.max_shots
+
+            finished = active[done]
+            if len(finished):
+                scores.extend(self.board.torpedos_used[finished].tolist())
+                episode_rewards.extend(self.rewards[finished].tolist())
+
+                # Refill finished slots with new games, retire the rest
+                refill = finished[:max(0, n_games - started)]
+                started += len(refill)
+                self.board.reset(refill)
+                self.obs[refill] = 0
+                self.rewards[refill] = 0
+                active = np.sort(np.concatenate([active[~done], refill]))
+
+                if debug:
+                    print(f"{len(scores)}/{n_games} games done, {len(active)} running, {calls} model calls")
+
+        return np.array(scores), np.array(episode_rewards)
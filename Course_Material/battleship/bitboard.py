@@ -0,0 +1,295 @@
+""" BitBoard
+
+Headless drop-in for Board that keeps the game state in integer bitmasks.
+Cell (i, j) is bit i * dim + j, so a 10x10 board fits in one Python int.
+
+A shot plus check_gameover() costs about 0.8 us against 1.5 us on Board, not
+the tenfold speedup asked for.  Two empty method calls already cost 0.12 us,
+and what is left is the handful of attribute reads and writes a shot needs,
+so a per-game Python engine cannot get much lower.  For throughput, play many
+games per call on BatchBoard: about 0.05 us per shot with 1024 boards.
+"""
+
+import numpy as np
+from .ship import Ship
+from .placement import STEPS, placement_table, resolve_fleet, sample_placement
+
+
+class BitBoard():
+    """ BitBoard object.  Same game as Board, without visualization.
+
+        Attributes:
+        - dim : int  -- dimension of square board
+        - ships : list(Ship)  -- information about battleships on the board
+        - torpedos_used : int  -- number of torpedos fired so far
+        - occupied : int  -- bitmask of cells holding a ship
+        - hits : int  -- bitmask of ship cells torpedo'd
+        - misses : int  -- bitmask of ocean cells torpedo'd
+        - ship_masks : list(int)  -- bitmask of the cells of each ship
+
+        Behaviors:
+        - torpedo(coordinates : (int, int))  -- launch torpedo @ coordinate
+        - score() -- return self.torpedos_used
+        - check_gameover() -- Check gameover condition (all boats sunken)
+        - ships_afloat_count() --  Returns number of ships current not sunk
+        - print()  -- Returns the grid as np.array, in the encoding of Board.grid
+        - snapshot() / restore(snapshot) -- Save and rewind the game state
+        - clone() -- Copy of the board for search agents
+        - reset() -- New game on this board, from the same ship_config
+
+        torpedo() and check_gameover() are O(1): a shot is a bit test against
+        occupied and hits, and the game is over when hits == occupied.
+    """
+
+    def __init__(self, dim:int=10, ship_config='default', vis=False, playmode=True):
+        """ Initializes game board for Battleship
+              dim - dimension of square grid
+              ship_config - 'default' for standard ship configuration and random placement.
+                  'scaled' or a list of (name, size) pairs for other fleets, as in SparseBoard.
+                  Also accepts a list of Ship objects to subvert default placement.
+              vis, playmode - accepted for compatibility with Board.  BitBoard is always headless
+        """
+        if vis:
+            raise ValueError("BitBoard has no visualization, use Board(vis=True)")
+
+        self.dim = dim
+        self.vis = False
+        self.ship_config = ship_config
+        # True while the layout lists are shared with a clone
+        self._layout_shared = True
+        self.reset()
+
+
+    def reset(self):
+        """ Starts a new game in place: random ships are drawn again, preset ships put back.
+            The ship list, Ship objects and layout lists are cleared and refilled, not rebuilt,
+            unless they are shared with a clone
+        """
+        if self._layout_shared:
+            self.ships = list()
+            self.ship_masks = list()
+            # life_points of each ship, the ships read and write their slot
+            self._lives = list()
+            # Index of the ship on each cell, -1 for ocean
+            self._cell_ship = [-1] * (self.dim * self.dim)
+            self._layout_shared = False
+        else:
+            # Only the cells of the last layout hold a ship index
+            for mask in self.ship_masks:
+                while mask:
+                    low = mask & -mask
+                    self._cell_ship[low.bit_length() - 1] = -1
+                    mask ^= low
+            self.ship_masks.clear()
+            self._lives.clear()
+
+        self.occupied = 0
+        self.hits = 0
+        self.misses = 0
+        self.torpedos_used = 0
+        self._afloat = 0
+
+        self._spawn_ships(presets=self.ship_config)
+        del self.ships[len(self.ship_masks):]
+
+
+
+    ##################
+    # Public behaviors
+
+    def torpedo(self, coordinates):
+        """ Launch attack on coordinate (i, j).  Coordinate is tuple of ints
+
+            Return 0 for miss.  1 for hit.
+            Hitting a location already torpedo'd is a miss.
+        """
+
+        i, j = coordinates
+        dim = self.dim
+        if not (0 <= i < dim and 0 <= j < dim):
+            return ValueError("Provided coordinates are invalid")
+
+        self.torpedos_used += 1
+
+        k = int(i) * dim + int(j)
+        idx = self._cell_ship[k]
+        bit = 1 << k
+
+        # ocean
+        if idx < 0:
+            self.misses |= bit
+            return 0
+
+        # repeated hit
+        if self.hits & bit:
+            return 0
+
+        # success case, the ship's life_points slot is decremented directly instead of through Ship.ouch()
+        self.hits |= bit
+        lives = self._lives
+        lives[idx] -= 1
+        if not lives[idx]:
+            self._afloat -= 1
+
+        return 1
+
+
+    def score(self):
+        """ Returns int of torpedos used.  Essentially a score on the game
+        """
+        return self.torpedos_used
+
+
+    def check_gameover(self):
+        """ Check gameover condition (all ships sunk).
+        """
+        return self.hits == self.occupied
+
+
+    def ships_afloat_count(self):
+        """ Returns number of ships remaining on the board and total lives left
+        """
+        return self._afloat, bin(self.occupied & ~self.hits).count('1')
+
+
+    def print(self):
+        """ Grid as np.array: 0 for ocean, +Z for ship locations, -Z for hit ships
+        """
+        grid = np.zeros(self.dim * self.dim, dtype=np.int32)
+        for k, idx in enumerate(self._cell_ship):
+            if idx >= 0:
+                grid[k] = -(idx + 1) if (self.hits >> k) & 1 else idx + 1
+
+        return grid.reshape(self.dim, self.dim)
+
+
+    @property
+    def grid(self):
+        return self.print()
+
+
+    def snapshot(self):
+        """ Game state as a tuple of ints: hits, misses, torpedos used, ships afloat, life points
+        """
+        return (self.hits, self.misses, self.torpedos_used, self._afloat) + tuple(self._lives)
+
+
+    def restore(self, snapshot):
+        """ Rewinds the game to a snapshot() of this board
+        """
+        self.hits, self.misses, self.torpedos_used, self._afloat = snapshot[:4]
+        self._lives[:] = snapshot[4:]
+
+
+    def clone(self):
+        """ Copy of the board.  The layout is immutable and shared, only the
+            life points are copied, so cloning is O(ships)
+        """
+        other = BitBoard.__new__(BitBoard)
+        other.__dict__.update(self.__dict__)
+        other._lives = list(self._lives)
+        other.ships = [Ship(name=ship.name, size=ship.size, head_loc=ship.head_loc, orient=ship.orient)
+                       for ship in self.ships]
+        for k, ship in enumerate(other.ships):
+            ship._bind(other._lives, k)
+
+        # The layout lists stay shared, the next reset() of either board builds new ones
+        self._layout_shared = other._layout_shared = True
+        return other
+
+
+
+    ##################
+    # Private behaviors
+
+    def _spawn_ships(self, presets='default'):
+        """ Spawn ships on the grid
+
+            presets defines ship configuration.
+            placement and orientation is uniform random across the grid.
+        """
+
+        fleet = resolve_fleet(presets, self.dim)
+        if fleet is not None:
+            for name, size in fleet:
+                self._spawn_ship_random(name, size)
+
+        elif isinstance(presets[0], Ship):
+            for preset in presets:
+                # Copies, torpedo() decrements life_points
+                ship = self._next_ship(preset.name, preset.size, preset.head_loc, preset.orient)
+                mask = self._ship_mask(ship.head_loc, ship.orient, ship.size)
+                if mask is None:
+                    raise ValueError(f"{ship} does not fit on the board")
+                self._place_ship(ship, mask)
+
+        else:
+            raise ValueError("Input presets into _spawn_ships() is not valid")
+
+
+    def _spawn_ship_random(self, name, size):
+        """ Spawns a ship.  Uniform random among the placements left free
+        """
+
+        p = sample_placement(self.dim, size, self.occupied)
+        table = placement_table(self.dim, size)
+        ship = self._next_ship(name, size, table.heads[p], table.orients[p])
+        self._place_ship(ship, table.masks[p])
+
+
+    def _next_ship(self, name, size, head_loc, orient):
+        """ Ship for the next slot, the one of the last game moved in place if there is one
+        """
+        k = len(self.ship_masks)
+        if k == len(self.ships):
+            return Ship(name=name, size=size, head_loc=head_loc, orient=orient)
+
+        ship = self.ships[k]
+        ship.name, ship.size, ship.head_loc, ship.orient = name, size, head_loc, orient
+        return ship
+
+
+    def _ship_mask(self, head_pos, orient, size):
+        """ Bitmask of a ship placement, None if it leaves the grid or overlaps a ship
+        """
+
+        i, j = int(head_pos[0]), int(head_pos[1])
+        di, dj = STEPS[orient]
+        i_end, j_end = i + di * (size - 1), j + dj * (size - 1)
+        if not (0 <= min(i, i_end) and max(i, i_end) < self.dim and
+                0 <= min(j, j_end) and max(j, j_end) < self.dim):
+            return None
+
+        mask = 0
+        for step in range(size):
+            mask |= 1 << ((i + di * step) * self.dim + j + dj * step)
+
+        if mask & self.occupied:
+            return None
+        return mask
+
+
+    def _place_ship(self, ship, mask):
+        """ Adds ship to the bitmasks and the cell index
+        """
+
+        idx = len(self.ship_masks)
+        self._lives.append(ship.size)
+        ship._bind(self._lives, idx)
+        if idx == len(self.ships):
+            self.ships.append(ship)
+        self.ship_masks.append(mask)
+        self.occupied |= mask
+        self._afloat += 1
+
+        while mask:
+            low = mask & -mask
+            self._cell_ship[low.bit_length() - 1] = idx
+            mask ^= low
+
+
+    def _is_position_valid(self, pos):
+        """ Checks if pos = (i, j) lies on the grid
+        """
+        i, j = pos
+        return 0 <= i < self.dim and 0 <= j < self.dim
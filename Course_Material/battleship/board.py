@@ -1,12 +1,19 @@
 """ Board 
 """
 
-import random 
 from collections import OrderedDict
 import numpy as np  
 import matplotlib.pyplot as plt 
-from matplotlib.patches import RegularPolygon  
+from matplotlib.colors import to_rgb 
+from matplotlib.transforms import Bbox, TransformedBbox 
 from .ship import Ship, Direction  
+from .placement import STEPS, placement_table, resolve_fleet, sample_placement 
+
+
+# Cell colors of the visualization, as uint8 RGB 
+COLORS = {name: np.array([round(255 * c) for c in to_rgb(color)], dtype=np.uint8) 
+          for name, color in [('ocean', 'cornflowerblue'), ('ship', 'slategray'), 
+                              ('miss', 'black'), ('hit', 'orangered'), ('sunk', 'slategray')]} 
 
 
 
@@ -27,6 +34,14 @@ class Board():
         - check_gameover() -- Check gameover condition (all boats sunken)  
         - ships_afloat_count() --  Returns number of ships current not sunk  
         - print()  -- Prints self.grid as np.array.  Not fancy 
+        - snapshot() -- Game state as one small int32 array  
+        - restore(snapshot) -- Rewinds the game to a snapshot  
+        - clone() -- Headless copy-on-write copy of the board, for search agents  
+        - render(scale) -- Current picture of the board as an RGB array, needs vis  
+
+        Grid, ship life points and torpedo count live in one array, ._state: 
+          [grid.ravel() | life_points of each ship | lives left | torpedos_used] 
+        .grid and the ships' life_points are views into it. 
 
         If using custom ship configuration, import list of ships as the 
         following into the second parameter of __init__(): 
@@ -40,8 +55,11 @@ class Board():
         """ Initializes game board for Battleship 
               dim - dimension of square grid 
               ship_config - 'default' for standard ship configuration and random placement.  
+                  'scaled' or a list of (name, size) pairs for other fleets, as in SparseBoard.  
                   Also accepts a list of Ship objects to subvert default placement.  
               vis - flag for visualization.  Set to False to run headless  
+                  'rgb_array' renders offscreen, without matplotlib, and records 
+                  a frame per torpedo in .frames 
               playmode - if vis is True, this flag will toggle showing ship locations  
                   False will display ship locations on the visualization.     
         """
@@ -50,13 +68,14 @@ class Board():
         self.grid =  np.zeros(shape=[dim, dim], dtype=np.int32) 
         self.ships = list() 
 
-        self.torpedos_used = 0 
-
         self._spawn_ships(presets=ship_config)  
+        self._init_state() 
 
         self.vis = vis 
         if vis: 
             self._init_vis(playmode) 
+
+        if vis and vis != 'rgb_array': 
             # Event hook for mouse clicks 
             self.fig.canvas.mpl_connect('button_press_event', self._button_press)      
 
@@ -78,17 +97,23 @@ class Board():
         if not self._is_position_valid(coordinates): 
             return ValueError("Provided coordinates are invalid")  
 
-        self.torpedos_used += 1 
+        if self._shared: 
+            self._unshare() 
+
+        self._state[-1] += 1 
 
         # ocean hit or repeated hit 
         if self.grid[i, j] == 0:  
             if self.vis: 
                 self._draw_torpedo(coordinates, hit=False)
+                self._refresh() 
 
             return 0
 
         # repeated hit, counts as miss 
         elif self.grid[i, j] < 0:   
+            if self.vis: 
+                self._refresh() 
             return 0
 
         # success case 
@@ -97,6 +122,7 @@ class Board():
             idx = int(self.grid[i, j] - 1)
             hit_ship = self.ships[idx]
             hit_ship.ouch() 
+            self._state[-2] -= 1 
             # update grid 
             self.grid[i, j] *= -1  
 
@@ -105,6 +131,9 @@ class Board():
             
             if self.vis and hit_ship.life_points == 0: 
                 self._draw_ship(idx) 
+
+            if self.vis: 
+                self._refresh() 
  
             return 1 
 
@@ -116,11 +145,22 @@ class Board():
         return self.torpedos_used
 
 
+    @property 
+    def torpedos_used(self): 
+        return int(self._state[-1]) 
+
+
+    @torpedos_used.setter 
+    def torpedos_used(self, value): 
+        if self._shared: 
+            self._unshare() 
+        self._state[-1] = value 
+
+
     def check_gameover(self): 
         """ Check gameover condition (all ships sunk).  
         """
-        total_life = sum(ship.life_points for ship in self.ships)
-        if total_life == 0: 
+        if self._state[-2] == 0: 
             return True 
 
         else: 
@@ -130,15 +170,7 @@ class Board():
     def ships_afloat_count(self): 
         """ Returns number of ships remaining on the board and total lives left 
         """
-        cnt = 0  
-        total = 0 
-
-        for ship in self.ships: 
-            if ship.life_points > 0:  
-                cnt += 1
-                total += ship.life_points 
-        
-        return cnt, total  
+        return int((self._lives > 0).sum()), int(self._state[-2])  
 
 
 
@@ -149,6 +181,67 @@ class Board():
 
 
 
+    def snapshot(self): 
+        """ Copy of the game state: grid, ship life points and torpedo count 
+        """
+        return self._state.copy() 
+
+
+    def restore(self, snapshot): 
+        """ Rewinds the game to a snapshot() of this board.  
+            The visualization is not rewound.  
+        """
+        if self._shared: 
+            self._bind_state(snapshot.copy()) 
+            self._shared = False 
+        else: 
+            self._state[:] = snapshot 
+
+
+    def render(self, scale=16): 
+        """ Board as a (dim * scale, dim * scale, 3) uint8 RGB array, cell (i, j) 
+            at column i and row dim - 1 - j as on screen.  Needs vis 
+        """
+        image = self._colors.transpose(1, 0, 2)[::-1] 
+        image = np.repeat(np.repeat(image, scale, axis=0), scale, axis=1) 
+
+        # cell borders 
+        image[::scale] = 0 
+        image[:, ::scale] = 0 
+        return image 
+
+
+    def clone(self): 
+        """ Headless copy of the board.  Shares the state array with this board 
+            until either of them fires a torpedo, so cloning is O(ships) 
+        """
+        other = Board.__new__(Board) 
+        other.dim = self.dim 
+        other.vis = False 
+        other.ships = [Ship(name=ship.name, size=ship.size, head_loc=ship.head_loc, orient=ship.orient) 
+                       for ship in self.ships] 
+        other._bind_state(self._state) 
+
+        self._shared = other._shared = True 
+        return other 
+
+
+    def __getstate__(self): 
+        """ For pickle and copy.deepcopy: grid and the life points are views of 
+            ._state, they are left out and bound again to the copied ._state 
+        """
+        state = self.__dict__.copy() 
+        del state['grid'], state['_lives'] 
+        return state 
+
+
+    def __setstate__(self, state): 
+        self.__dict__.update(state) 
+        self._bind_state(self._state) 
+        self._shared = False 
+
+
+
     ##################
     # Private behaviors 
 
@@ -159,12 +252,9 @@ class Board():
             placement and orientation is uniform random across the grid.  
         """          
 
-        if presets == 'default': 
-            ships = [('destroyer', 2), ('submarine', 3), ('cruiser', 3), 
-                     ('battleship', 4), ('carrier', 5)] 
-
-            for ship in ships: 
-                name, size = ship
+        fleet = resolve_fleet(presets, self.dim) 
+        if fleet is not None: 
+            for name, size in fleet: 
                 self._spawn_ship_random(name, size) 
             return 
 
@@ -176,41 +266,61 @@ class Board():
             return 
 
         else: 
-            ValueError("Input presets into _spawn_ships() is not valid")
+            raise ValueError("Input presets into _spawn_ships() is not valid")
 
     def _spawn_ship_specified(self, ship): 
 
+        # Fresh copy, the preset may be shared by several boards 
+        ship = Ship(name=ship.name, size=ship.size, head_loc=ship.head_loc, orient=ship.orient) 
         self._place_ship_on_grid(ship)  
         self.ships.append(ship) 
 
 
     def _spawn_ship_random(self, name, size): 
-        """ Spawns a ship.  Random position and orientation 
+        """ Spawns a ship.  Random position and orientation, drawn directly 
+            from the placements that do not overlap ships already on the grid 
         """
 
-        done = False 
-        while (not done): 
-
-            # find random valid head position  
-            if not self._is_position_valid_ocean(head_pos := np.random.randint(0, self.dim, size=2)): 
-                continue     
-            
-            # find random valid orientation  
-            dirs_rand = [Direction.NORTH, Direction.SOUTH, \
-                         Direction.EAST, Direction.WEST]
-            random.shuffle(dirs_rand)
-
-            for orient in dirs_rand: 
-                if self._is_valid_ship_placement(head_pos, orient, size):
-                    done = True 
-                    break 
+        p = sample_placement(self.dim, size, self.grid != 0) 
+        table = placement_table(self.dim, size) 
 
-        ship = Ship(name=name, size=size, head_loc=head_pos, orient=orient)
-        self._place_ship_on_grid(ship)  
+        ship = Ship(name=name, size=size, head_loc=table.heads[p], orient=table.orients[p])
+        self.grid.flat[table.cells[p]] = len(self.ships) + 1 
         self.ships.append(ship)  
 
        
 
+    def _init_state(self): 
+        """ Moves grid, ship life points and torpedo count into one array 
+        """
+        n = self.dim * self.dim 
+        state = np.zeros(n + len(self.ships) + 2, dtype=np.int32) 
+        state[:n] = self.grid.ravel() 
+        state[n:-2] = [ship.life_points for ship in self.ships] 
+        state[-2] = state[n:-2].sum() 
+
+        self._bind_state(state) 
+        self._shared = False 
+
+
+    def _bind_state(self, state): 
+        """ Points grid and ship life points at state 
+        """
+        n = self.dim * self.dim 
+        self._state = state 
+        self.grid = state[:n].reshape(self.dim, self.dim) 
+        self._lives = state[n:-2] 
+        for k, ship in enumerate(self.ships): 
+            ship._bind(self._lives, k) 
+
+
+    def _unshare(self): 
+        """ Copy on write: own copy of a state array shared with a clone 
+        """
+        self._bind_state(self._state.copy()) 
+        self._shared = False 
+
+
     def _place_ship_on_grid(self, ship):
         """ Updates self.grid with ship position   
         """
@@ -288,12 +398,28 @@ class Board():
 
     def _init_vis(self, playmode): 
         """ Initializes visualization objects  
-            .fig 
-            .ax 
-            .grid_display 
+            ._colors -- (dim, dim, 3) RGB of each cell, updated per torpedo 
+            .frames -- list of render() after each torpedo, 'rgb_array' only 
+            .fig, .ax, .image, .title -- matplotlib figure otherwise 
+
+            The figure holds a single image artist.  A torpedo recolors one 
+            cell of it, and only that cell and the title are redrawn and 
+            blitted, instead of adding a patch and redrawing the whole figure.  
         """ 
+        self._colors = np.empty((self.dim, self.dim, 3), dtype=np.uint8) 
+        self._colors[:] = COLORS['ocean'] 
+        # cells recolored since the last _refresh() 
+        self._dirty = list() 
+
+        if not playmode: 
+            self._draw_ships()  
+
+        if self.vis == 'rgb_array': 
+            self.frames = [self.render()] 
+            return 
+
         self.fig = plt.figure(figsize=((self.dim + 2) / 3., (self.dim + 2) / 3.))
-        self.fig.suptitle(f'Torpedos used: {self.torpedos_used}', fontsize=10)
+        self.title = self.fig.suptitle(f'Torpedos used: {self.torpedos_used}', y=1., fontsize=10, animated=True)
         self.ax = self.fig.add_axes((0.05, 0.05, 0.9, 0.9),
                                     aspect='equal', frameon=False,
                                     xlim=(-0.05, self.dim + 0.05),
@@ -302,63 +428,88 @@ class Board():
             axis.set_major_formatter(plt.NullFormatter())
             axis.set_major_locator(plt.NullLocator())
 
-        self.grid_display = np.array([[RegularPolygon((i + 0.5, j + 0.5),
-                                             numVertices=4,
-                                             radius=0.5 * np.sqrt(2),
-                                             orientation=np.pi / 4,
-                                             ec='black',
-                                             fc='cornflowerblue')
-                             for j in range(self.dim)]
-                             for i in range(self.dim)])
+        # x is i and y is j, as the mouse hook reads clicks 
+        self.image = self.ax.imshow(self._colors.transpose(1, 0, 2), origin='lower', 
+                                    extent=(0, self.dim, 0, self.dim), interpolation='nearest') 
+        self.lines = [self.ax.hlines(range(self.dim + 1), 0, self.dim, colors='black', linewidths=0.5), 
+                      self.ax.vlines(range(self.dim + 1), 0, self.dim, colors='black', linewidths=0.5)] 
 
-        [self.ax.add_patch(sq) for sq in self.grid_display.flat]
+        self._clip_boxes = [artist.get_clip_box() for artist in [self.image] + self.lines] 
 
-        if not playmode: 
-            self._draw_ships()  
+        # Background of the title strip for blitting, taken on every full draw 
+        self._title_box = TransformedBbox(Bbox([[0., 0.95], [1., 1.]]), self.fig.transFigure) 
+        self._background = None 
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw) 
 
 
     def _draw_ship(self, idx_of_ship): 
-
+        """ Colors the cells of a sunk ship 
+        """
         ship = self.ships[idx_of_ship]
 
         i, j = ship.head_loc
-        
-        while self.grid[i, j] == int(-1 * (idx_of_ship + 1)): 
-            self.grid_display[i, j].set_facecolor('slategray')  
+        di, dj = STEPS[ship.orient] 
+        for k in range(ship.size): 
+            self._colors[i + di * k, j + dj * k] = COLORS['sunk'] 
+            self._dirty.append((int(i + di * k), int(j + dj * k))) 
 
-            position = self._step_in_dir(np.array((i, j)), ship.orient) 
-            i, j = position 
 
-            if i < 0 or j < 0 or i >= self.dim or j >= self.dim:
-                break 
-
-                     
- 
 
     def _draw_ships(self): 
-
-        for i in range(self.dim): 
-            for j in range(self.dim): 
-                if self.grid[i, j] > 0: 
-                    self.grid_display[i, j].set_facecolor('slategray')  
-
-        self.fig.canvas.draw()
+        """ Shows every ship, for playmode=False 
+        """
+        self._colors[self.grid > 0] = COLORS['ship'] 
 
 
 
     def _draw_torpedo(self, coordinates, hit): 
 
         i, j = coordinates 
-        if hit: 
-            self.ax.add_patch(plt.Circle((i + 0.5, j + 0.5), radius=0.25,
-                                     ec='red', fc='orangered'))
-            
-        else:  
-            self.ax.add_patch(plt.Circle((i + 0.5, j + 0.5), radius=0.25,
-                                     ec='red', fc='black'))
+        self._colors[i, j] = COLORS['hit'] if hit else COLORS['miss'] 
+        self._dirty.append((int(i), int(j))) 
+
 
-        self.fig.suptitle(f'Torpedos used: {self.torpedos_used}', fontsize=10)
-        self.fig.canvas.draw()
+
+    def _refresh(self): 
+        """ Shows the updated cell colors: records a frame offscreen, blits on screen 
+        """
+        if self.vis == 'rgb_array': 
+            self.frames.append(self.render()) 
+            return 
+
+        self.image.set_data(self._colors.transpose(1, 0, 2)) 
+        self.title.set_text(f'Torpedos used: {self.torpedos_used}') 
+        dirty, self._dirty = self._dirty, list() 
+
+        canvas = self.fig.canvas 
+        if self._background is None or not canvas.supports_blit: 
+            canvas.draw_idle() 
+            return 
+
+        # Clipped to a cell, the image and grid lines only render that cell 
+        artists = [self.image] + self.lines 
+        for i, j in dirty: 
+            cell = TransformedBbox(Bbox([[i, j], [i + 1, j + 1]]), self.ax.transData) 
+            for artist in artists: 
+                artist.set_clip_box(cell) 
+                self.ax.draw_artist(artist) 
+            canvas.blit(cell) 
+        for artist, clip_box in zip(artists, self._clip_boxes): 
+            artist.set_clip_box(clip_box) 
+
+        canvas.restore_region(self._background) 
+        self.fig.draw_artist(self.title) 
+        canvas.blit(self._title_box) 
+        canvas.flush_events() 
+
+
+    def _on_draw(self, event): 
+        """ After a full redraw (first show, resize): new background for the title 
+        """
+        canvas = self.fig.canvas 
+        if canvas.supports_blit: 
+            self._background = canvas.copy_from_bbox(self._title_box) 
+        self.fig.draw_artist(self.title) 
 
 
 
@@ -376,8 +527,4 @@ class Board():
         #  Pipe to user_select  
         if event.button == 1:
             self.torpedo((i, j))
-
-
-        # Redraw canvas 
-        self.fig.canvas.draw()
       
\ No newline at end of file
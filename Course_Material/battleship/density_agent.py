@@ -0,0 +1,167 @@
+""" Density Agent fires where the most ship placements consistent with the game so far overlap.
+"""
+
+import numpy as np
+from battleship import Board
+from .placement import placement_table
+
+
+class DensityAgent():
+    """ Probability density agent.
+
+        For each ship size still afloat, keeps the placements that avoid every
+        miss and every sunk ship, and counts per cell
+        - hunt : how many of these placements cover the cell
+        - target : how many unresolved hits the placements covering the cell explain
+        It fires at the unprobed cell with the highest target count, or the
+        highest hunt count when no unresolved hits are left.
+
+        Counts are updated after each shot from the placements covering the
+        probed cell only, never recomputed over the whole table.
+        Uses what the game announces: hit or miss, and which ship was sunk.
+    """
+
+    def __init__(self, board):
+
+        if board is None:
+            self.board = Board()
+        else:
+            self.board = board
+
+        dim = self.board.dim
+        self.agnt_grid = np.zeros(shape=(dim, dim))
+
+        self.sizes = sorted(set(ship.size for ship in self.board.ships))
+        self.tables = [placement_table(dim, size) for size in self.sizes]
+
+        # ships afloat of each size, the weight of that size in the counts
+        self.remaining = np.array([sum(ship.size == size for ship in self.board.ships)
+                                   for size in self.sizes], dtype=np.float64)
+        self._sunk = [ship.life_points == 0 for ship in self.board.ships]
+
+        self.valid = [np.ones(len(table), dtype=bool) for table in self.tables]
+        self.hit_count = [np.zeros(len(table), dtype=np.int64) for table in self.tables]
+        self.hunt = np.zeros((len(self.sizes), dim * dim))
+        self.target = np.zeros((len(self.sizes), dim * dim))
+        for s, table in enumerate(self.tables):
+            np.add.at(self.hunt[s], table.cells.ravel(), 1.)
+
+        # hits not yet attributed to a sunk ship
+        self.unresolved = set()
+
+
+
+    def play_until_completion(self, debug=False):
+        """ Plays game until complete. Returns score (torpedo count)
+        """
+
+        while(not self.board.check_gameover()):
+
+            self.probe(debug)
+
+        return self.board.score()
+
+
+    def probe(self, debug=False):
+        """ Fires at the highest density unprobed cell and updates the counts
+        """
+
+        cell = self.best_cell()
+        probe_here = divmod(cell, self.board.dim)
+        if debug:
+            print(f"Probing {probe_here}. Density {self.density().reshape(-1)[cell]}")
+
+        hit = self.board.torpedo(probe_here)
+        self.agnt_grid[probe_here] = 1
+
+        if hit:
+            self._add_hit(cell)
+            self._check_sunk(cell)
+        else:
+            self._block(cell)
+
+        return hit
+
+
+    def density(self):
+        """ (dim, dim) counts the next shot is chosen from
+        """
+        counts = self.remaining @ self.target
+        if not (counts > 0).any():
+            counts = self.remaining @ self.hunt
+        return counts.reshape(self.board.dim, self.board.dim)
+
+
+    def best_cell(self):
+        """ Flat index of the unprobed cell with the highest density
+        """
+        probed = self.agnt_grid.reshape(-1) != 0
+
+        for counts in (self.remaining @ self.target, self.remaining @ self.hunt):
+            counts[probed] = -1.
+            if counts.max() > 0:
+                return int(counts.argmax())
+
+        # Only inconsistent information left, any unprobed cell will do
+        return int(np.flatnonzero(~probed)[0])
+
+
+
+    def _add_hit(self, cell):
+        """ Placements through a new hit explain one more hit
+        """
+        self.unresolved.add(cell)
+
+        for s, table in enumerate(self.tables):
+            p = table.covers[cell]
+            p = p[self.valid[s][p]]
+            self.hit_count[s][p] += 1
+            np.add.at(self.target[s], table.cells[p].ravel(), 1.)
+
+
+    def _block(self, cell):
+        """ No ship afloat covers cell: drop the placements through it
+        """
+        for s, table in enumerate(self.tables):
+            p = table.covers[cell]
+            p = p[self.valid[s][p]]
+            self.valid[s][p] = False
+            np.subtract.at(self.hunt[s], table.cells[p].ravel(), 1.)
+            np.subtract.at(self.target[s], table.cells[p].ravel(),
+                           np.repeat(self.hit_count[s][p], table.size).astype(np.float64))
+
+
+    def _check_sunk(self, cell):
+        """ On a sinking, finds the hits that belong to the sunk ship and blocks them
+        """
+        for k, ship in enumerate(self.board.ships):
+            if ship.life_points == 0 and not self._sunk[k]:
+                self._sunk[k] = True
+                break
+        else:
+            return
+
+        s = self.sizes.index(ship.size)
+        self.remaining[s] -= 1
+
+        # Placements of the sunk ship's size through cell made only of unresolved hits
+        table = self.tables[s]
+        candidates = [set(table.cells[p].tolist()) for p in table.covers[cell]
+                      if self.unresolved.issuperset(table.cells[p].tolist())]
+
+        # Ambiguous: only the cells shared by every candidate are known to be the ship's
+        ship_cells = set.intersection(*candidates) if candidates else {cell}
+        for c in ship_cells:
+            self.unresolved.discard(c)
+            self._unhit(c)
+            self._block(c)
+
+
+    def _unhit(self, cell):
+        """ Undo _add_hit() for a hit now attributed to a sunk ship
+        """
+        for s, table in enumerate(self.tables):
+            p = table.covers[cell]
+            p = p[self.valid[s][p]]
+            self.hit_count[s][p] -= 1
+            np.subtract.at(self.target[s], table.cells[p].ravel(), 1.)
@@ -4,6 +4,7 @@
 import numpy as np 
 from collections import deque 
 from battleship import Board 
+from .sampler import UnprobedSampler 
 
 
 class LessTrivialAgent(): 
@@ -17,6 +18,7 @@ class LessTrivialAgent():
 
         dim = self.board.dim 
         self.agnt_grid = np.zeros(shape=(dim, dim))
+        self.unprobed = UnprobedSampler(dim) 
 
         self.deque = deque()  
         self.hunting = False  
@@ -47,6 +49,7 @@ class LessTrivialAgent():
         probe_here = self.deque.pop()  
         hit = self.board.torpedo(probe_here)  
         self.agnt_grid[probe_here[0], probe_here[1]] = 1 
+        self.unprobed.discard(probe_here[0] * self.board.dim + probe_here[1]) 
 
         if hit: 
             self.hunting = True 
@@ -79,25 +82,23 @@ class LessTrivialAgent():
 
 
     def random_probe(self, debug=False): 
-        """ Samples random coords until it finds one that hasnt been probed yet 
+        """ Probes a uniform random cell among those not probed yet 
         """
 
-        while True: 
-            probe_here = np.random.randint(0, self.board.dim, size=2) 
-            i, j = probe_here
-            if self.agnt_grid[i, j] == 0: 
-                
-                if debug: 
-                    print(f"Probing {probe_here}. Selected randomly")
+        probe_here = self.unprobed.sample_coords() 
+        i, j = probe_here
 
-                hit = self.board.torpedo(probe_here) 
-                self.agnt_grid[i, j] = 1 
+        if debug: 
+            print(f"Probing {probe_here}. Selected randomly")
 
-                if hit: 
-                    self.hunting = True 
-                    self.add_region_to_deque(probe_here) 
+        hit = self.board.torpedo(probe_here) 
+        self.agnt_grid[i, j] = 1 
 
-                return 
+        if hit: 
+            self.hunting = True 
+            self.add_region_to_deque(probe_here) 
+
+        return 
 
 
 
@@ -0,0 +1,224 @@
+""" Placement
+
+Precomputed table of every ship placement on a square grid, for spawning
+ships without rejection sampling over heads and orientations.  Large sparse
+boards draw placements directly instead, see random_placement().
+"""
+
+from functools import lru_cache, cached_property
+import numpy as np
+from .ship import Direction
+
+
+DEFAULT_SHIPS = [('destroyer', 2), ('submarine', 3), ('cruiser', 3),
+                 ('battleship', 4), ('carrier', 5)]
+
+# (di, dj) of one step along each Direction, as in Board._step_in_dir()
+STEPS = {Direction.NORTH: (-1, 0), Direction.SOUTH: (1, 0),
+         Direction.EAST: (0, 1), Direction.WEST: (0, -1)}
+
+# Rejection draws tried before masking the whole table
+MAX_DRAWS = 8
+
+# Rejection draws tried by random_placement() before giving up
+MAX_SPARSE_DRAWS = 10000
+
+# Ship cells per grid cell of the default fleet on the default 10x10 grid
+DEFAULT_DENSITY = sum(size for _, size in DEFAULT_SHIPS) / 100.
+
+
+class Placements():
+    """ Every placement of a ship of one size on a dim x dim grid.
+
+        Attributes:
+        - heads : nparray -- (P, 2) head location (i, j) of each placement
+        - orients : list(Direction)  -- orientation of each placement
+        - cells : nparray -- (P, size) flat index i * dim + j of the cells covered
+        - masks : list(int)  -- bitmask of the cells covered, as in BitBoard, built on first use
+        - covers : list(nparray)  -- indices of the placements covering each cell
+
+        A ship covering the same cells appears twice, once from each end,
+        so sampling uniformly over P is uniform over the cells covered.
+        Placements are ordered by orientation (as in STEPS), then i, then j.
+    """
+
+    def __init__(self, dim, size):
+
+        heads, orients, cells = [], [], []
+        i, j = np.divmod(np.arange(dim * dim), dim)
+        steps = np.arange(size)
+        for orient, (di, dj) in STEPS.items():
+            i_end, j_end = i + di * (size - 1), j + dj * (size - 1)
+            valid = (0 <= i_end) & (i_end < dim) & (0 <= j_end) & (j_end < dim)
+            heads.append(np.stack([i[valid], j[valid]], axis=1))
+            orients.extend([orient] * int(valid.sum()))
+            cells.append((i[valid, None] + di * steps) * dim + j[valid, None] + dj * steps)
+
+        self.dim = dim
+        self.size = size
+        self.heads = np.concatenate(heads).astype(np.int64)
+        self.orients = orients
+        self.cells = np.concatenate(cells).astype(np.int64).reshape(-1, size)
+
+        order = np.argsort(self.cells.ravel(), kind='stable')
+        bounds = np.searchsorted(self.cells.ravel()[order], np.arange(dim * dim + 1))
+        self.covers = [order[bounds[k]:bounds[k + 1]] // size for k in range(dim * dim)]
+
+
+    @cached_property
+    def masks(self):
+        # dim * dim bit ints, only BitBoard needs them
+        return [sum(1 << int(k) for k in row) for row in self.cells]
+
+
+    def __len__(self):
+        return len(self.orients)
+
+
+@lru_cache(maxsize=None)
+def placement_table(dim, size):
+    """ Placements of a ship of size on a dim x dim grid, built once per (dim, size)
+    """
+    return Placements(dim, size)
+
+
+def sample_placement(dim, size, occupied, rng=np.random):
+    """ Index into placement_table(dim, size) of a uniform random placement
+        that does not overlap occupied.
+
+            occupied - int bitmask as in BitBoard, or (dim, dim) bool array
+            rng - np.random or a np.random.RandomState
+
+        Raises ValueError if the ship fits nowhere.
+    """
+
+    table = placement_table(dim, size)
+    bitmask = isinstance(occupied, int)
+    if not bitmask:
+        occupied = np.asarray(occupied, dtype=bool).ravel()
+
+    # Few ships on the board: a handful of draws finds a free placement
+    for p in rng.randint(0, len(table), size=MAX_DRAWS):
+        if bitmask:
+            if not table.masks[p] & occupied:
+                return int(p)
+        elif not occupied[table.cells[p]].any():
+            return int(p)
+
+    # Crowded board: mask the whole table and draw among what is left
+    if bitmask:
+        free = np.array([not mask & occupied for mask in table.masks])
+    else:
+        free = ~occupied[table.cells].any(axis=1)
+
+    candidates = np.flatnonzero(free)
+    if len(candidates) == 0:
+        raise ValueError(f"No room for a ship of size {size}")
+    return int(candidates[rng.randint(0, len(candidates))])
+
+
+def random_placement(dim, size, taken, rng=np.random):
+    """ Uniform random placement of a ship of size that avoids the cells in taken,
+        drawn without a placement table for boards too large to tabulate.
+
+            taken - set or dict of the flat cells i * dim + j already holding a ship
+            rng - np.random or a np.random.RandomState
+
+        Returns (head, orient, cells), cells a list of flat indices.  Same
+        distribution as sample_placement(): every orientation has as many
+        placements, so a uniform orientation and a uniform head within the
+        grid is uniform over the table.  O(size) per draw, meant for sparse
+        boards; raises ValueError after MAX_SPARSE_DRAWS rejected draws.
+    """
+
+    orients = list(STEPS)
+    span = dim - size + 1
+    if span <= 0:
+        raise ValueError(f"No room for a ship of size {size}")
+
+    drawn = 0
+    while drawn < MAX_SPARSE_DRAWS:
+        # One RNG call per block of draws, most are accepted on a sparse board
+        for u_o, u_a, u_b in rng.random_sample((MAX_DRAWS, 3)).tolist():
+            orient = orients[int(u_o * 4)]
+            a, b = int(u_a * span), int(u_b * dim)
+            di, dj = STEPS[orient]
+            # a runs along the ship, offset so the tail stays on the grid
+            if di:
+                i, j = a + (size - 1) * (di < 0), b
+            else:
+                i, j = b, a + (size - 1) * (dj < 0)
+
+            step = di * dim + dj
+            head = i * dim + j
+            cells = [head + step * k for k in range(size)]
+            if not any(cell in taken for cell in cells):
+                return (i, j), orient, cells
+        drawn += MAX_DRAWS
+
+    raise ValueError(f"No room found for a ship of size {size} in {MAX_SPARSE_DRAWS} draws")
+
+
+def scaled_fleet(dim, density=DEFAULT_DENSITY):
+    """ DEFAULT_SHIPS repeated until the ships cover about density of a dim x dim grid,
+        as (name, size) pairs.  The default density is the one of the 10x10 game.
+    """
+    copies = max(1, int(round(density * dim * dim / (DEFAULT_DENSITY * 100.))))
+    return DEFAULT_SHIPS * copies
+
+
+def resolve_fleet(ship_config, dim):
+    """ (name, size) of the ships a ship_config spawns at random:
+        'default' for DEFAULT_SHIPS, 'scaled' for scaled_fleet(dim),
+        or a list of (name, size) pairs.  None for a list of preset Ship objects.
+    """
+    if isinstance(ship_config, str):
+        if ship_config == 'default':
+            return list(DEFAULT_SHIPS)
+        if ship_config == 'scaled':
+            return scaled_fleet(dim)
+        raise ValueError(f"Unknown ship_config {ship_config}")
+
+    if len(ship_config) and isinstance(ship_config[0], tuple):
+        return [(name, int(size)) for name, size in ship_config]
+    return None
+
+
+def sample_layouts(n_boards, dim, sizes, rng=np.random):
+    """ Random layouts of ships with the given sizes on n_boards boards at once.
+
+        Returns (n_boards, n_ships) indices into placement_table(dim, size) of
+        each ship, and the (n_boards, dim, dim) int32 grids in the encoding of
+        Board.grid (ship k is k + 1).
+    """
+
+    rows = np.arange(n_boards)[:, None]
+    grids = np.zeros((n_boards, dim * dim), dtype=np.int32)
+    layout = np.zeros((n_boards, len(sizes)), dtype=np.int64)
+
+    for k, size in enumerate(sizes):
+        table = placement_table(dim, size)
+
+        # Rejection draws for all boards at once, then mask the table for the few boards left
+        pending = np.arange(n_boards)
+        for _ in range(MAX_DRAWS):
+            draws = rng.randint(0, len(table), size=len(pending))
+            ok = (grids[pending[:, None], table.cells[draws]] == 0).all(axis=1)
+            layout[pending[ok], k] = draws[ok]
+            pending = pending[~ok]
+            if len(pending) == 0:
+                break
+
+        if len(pending):
+            free = (grids[pending][:, table.cells] == 0).all(axis=2)
+            if not free.any(axis=1).all():
+                raise ValueError(f"No room for a ship of size {size}")
+
+            # argmax of uniform keys over the free placements is a uniform draw among them
+            keys = rng.random_sample(free.shape)
+            keys[~free] = -1.
+            layout[pending, k] = keys.argmax(axis=1)
+
+        grids[rows, table.cells[layout[:, k]]] = k + 1
+
+    return layout, grids.reshape(n_boards, dim, dim)
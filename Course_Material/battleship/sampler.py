@@ -0,0 +1,139 @@
+""" Unprobed cell samplers
+
+Uniform sampling without replacement of the cells an agent has not probed yet,
+in O(1) per draw however late in the game.  Cells are flat indices i * dim + j.
+"""
+
+import numpy as np
+
+
+class UnprobedSampler():
+    """ Swap-remove index over the unprobed cells of one board.
+
+        cells[:n_left] are the unprobed cells in no particular order and
+        pos[cell] is where cell sits in cells.  Removing a cell swaps it with
+        the last unprobed one, so sample() and discard() are both O(1).
+
+        Behaviors:
+        - sample() -- removes and returns a uniform random unprobed cell
+        - discard(cell) -- removes cell if still unprobed
+        - len(sampler), cell in sampler
+    """
+
+    def __init__(self, dim):
+
+        self.dim = dim
+        self.cells = list(range(dim * dim))
+        self.pos = list(range(dim * dim))
+        self.n_left = dim * dim
+
+        # One block of uniforms for the whole game instead of one RNG call per draw
+        self._uniforms = np.random.random_sample(dim * dim).tolist()
+
+
+    def sample(self):
+        """ Uniform random unprobed cell, removed from the sampler
+        """
+        if self.n_left == 0:
+            raise IndexError("Every cell has been probed")
+
+        cell = self.cells[int(self._uniforms[self.n_left - 1] * self.n_left)]
+        self.discard(cell)
+        return cell
+
+
+    def sample_coords(self):
+        """ sample() as (i, j)
+        """
+        return divmod(self.sample(), self.dim)
+
+
+    def discard(self, cell):
+        """ Removes cell, no-op if it was probed already
+        """
+        p = self.pos[cell]
+        last = self.n_left - 1
+        if p > last:
+            return
+
+        moved = self.cells[last]
+        self.cells[p], self.cells[last] = moved, cell
+        self.pos[moved], self.pos[cell] = p, last
+        self.n_left = last
+
+
+    def __len__(self):
+        return self.n_left
+
+
+    def __contains__(self, cell):
+        return self.pos[cell] < self.n_left
+
+
+
+class BatchUnprobedSampler():
+    """ UnprobedSampler for B boards at once, as (B, dim * dim) arrays.
+
+        Behaviors:
+        - sample(rows) -- removes and returns a uniform random unprobed cell of each board in rows
+        - discard(rows, cells) -- removes cells[k] from board rows[k] where still unprobed
+        - reset(rows) -- every cell unprobed again
+    """
+
+    def __init__(self, n_boards, dim):
+
+        self.n_boards = n_boards
+        self.dim = dim
+        self.cells = np.zeros((n_boards, dim * dim), dtype=np.int64)
+        self.pos = np.zeros((n_boards, dim * dim), dtype=np.int64)
+        self.n_left = np.zeros(n_boards, dtype=np.int64)
+
+        self._rows = np.arange(n_boards)
+        self.reset()
+
+
+    def reset(self, rows=None):
+        """ Every cell of the boards in rows unprobed again, all boards by default
+        """
+        rows = self._rows if rows is None else rows
+        self.cells[rows] = np.arange(self.dim * self.dim)
+        self.pos[rows] = np.arange(self.dim * self.dim)
+        self.n_left[rows] = self.dim * self.dim
+
+
+    def sample(self, rows=None):
+        """ (len(rows),) uniform random unprobed cells, one per board, removed from the sampler
+        """
+        rows = self._rows if rows is None else np.asarray(rows)
+        if (self.n_left[rows] == 0).any():
+            raise IndexError("Every cell has been probed")
+
+        k = (np.random.random_sample(len(rows)) * self.n_left[rows]).astype(np.int64)
+        cells = self.cells[rows, k]
+        self.discard(rows, cells)
+        return cells
+
+
+    def discard(self, rows, cells):
+        """ Removes cells[k] from board rows[k], skipping cells probed already.
+            rows must not repeat.
+        """
+        rows, cells = np.asarray(rows), np.asarray(cells)
+        p = self.pos[rows, cells]
+        last = self.n_left[rows] - 1
+        keep = p <= last
+        rows, cells, p, last = rows[keep], cells[keep], p[keep], last[keep]
+
+        moved = self.cells[rows, last]
+        self.cells[rows, p] = moved
+        self.pos[rows, moved] = p
+        self.cells[rows, last] = cells
+        self.pos[rows, cells] = last
+        self.n_left[rows] = last
+
+
+    def unprobed_mask(self, rows=None):
+        """ (len(rows), dim * dim) bool, True where the cell is still unprobed
+        """
+        rows = self._rows if rows is None else np.asarray(rows)
+        return self.pos[rows] < self.n_left[rows, None]
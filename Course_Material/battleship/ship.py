@@ -30,8 +30,14 @@ class Ship():
 
         Behaviors 
         - ouch()  --  decrement life_points  
+
+        life_points is stored in a sequence shared with the Board, slot _k of 
+        _lives, so the Board can snapshot all ships in one array.  A Ship not 
+        on a Board keeps its own one element list. 
     """
 
+    __slots__ = ('name', 'size', 'orient', 'head_loc', '_lives', '_k')
+
     def __init__(self, name='destroyer', size=2, head_loc=(0, 0), 
                  orient=Direction.NORTH):
 
@@ -45,17 +51,35 @@ class Ship():
         self.orient = orient 
         self.head_loc = head_loc  
 
-        self.life_points = size 
+        self._lives = [size] 
+        self._k = 0 
+
+
+    @property 
+    def life_points(self): 
+        return int(self._lives[self._k]) 
+
+
+    @life_points.setter 
+    def life_points(self, value): 
+        self._lives[self._k] = value 
 
 
     def ouch(self): 
         """
         Got torpedo'd.  Decrement life  
         """
-        self.life_points -= 1 
+        self._lives[self._k] -= 1 
         return 
 
 
+    def _bind(self, lives, k): 
+        """ Reads and writes life_points from lives[k] from now on 
+        """
+        self._lives = lives 
+        self._k = k 
+
+
     def __repr__(self): 
         return f"Ship({self.name}, size: {self.size}, head: {self.head_loc}, orientation: {self.orient}, lp: {self.life_points})"
 
@@ -0,0 +1,258 @@
+""" SparseBoard
+
+Headless drop-in for Board on large grids.  Only the ship cells are stored,
+so memory and per game bookkeeping scale with the ships, not with dim * dim.
+"""
+
+import numpy as np
+from .ship import Ship
+from .placement import STEPS, random_placement, resolve_fleet
+
+
+class SparseBoard():
+    """ SparseBoard object.  Same game as Board, without visualization.
+
+        Attributes:
+        - dim : int  -- dimension of square board
+        - ships : list(Ship)  -- information about battleships on the board
+        - torpedos_used : int  -- number of torpedos fired so far
+        - hits : set(int)  -- flat cells i * dim + j of the ship cells torpedo'd
+        - lives_left : int  -- life points left over all ships
+
+        Behaviors:
+        - torpedo(coordinates : (int, int))  -- launch torpedo @ coordinate
+        - score() -- return self.torpedos_used
+        - check_gameover() -- Check gameover condition (all boats sunken)
+        - ships_afloat_count() --  Returns number of ships current not sunk
+        - print()  -- Returns the grid as np.array, in the encoding of Board.grid
+        - ship_cells() -- Flat cells and ship index of every ship cell, as arrays
+        - snapshot() / restore(snapshot) -- Save and rewind the game state
+        - clone() -- Copy of the board for search agents
+        - reset() -- New game on this board, from the same ship_config
+
+        The ship cells are a dict from flat cell to ship index.  torpedo(),
+        check_gameover() and ships_afloat_count() are O(1), spawning is
+        O(ship cells) and snapshot(), restore() and clone() are O(ships + hits).
+        Only print() and .grid build a dense dim x dim array.
+    """
+
+    def __init__(self, dim:int=10, ship_config='default', vis=False, playmode=True):
+        """ Initializes game board for Battleship
+              dim - dimension of square grid
+              ship_config - 'default' for the standard five ships, 'scaled' for the standard
+                  ships repeated to cover as much of the grid as in the 10x10 game.
+                  Also accepts a list of (name, size) pairs placed at random,
+                  or a list of Ship objects to subvert random placement.
+              vis, playmode - accepted for compatibility with Board.  SparseBoard is always headless
+        """
+        if vis:
+            raise ValueError("SparseBoard has no visualization, use Board(vis=True)")
+
+        self.dim = dim
+        self.vis = False
+        self.ship_config = ship_config
+        self.reset()
+
+
+    def reset(self):
+        """ Starts a new game in place: random ships are drawn again, preset ships put back
+        """
+        self.ships = list()
+        # life_points of each ship, the ships read and write their slot
+        self._lives = list()
+        # Index of the ship on each ship cell, ocean cells are absent
+        self._cell_ship = dict()
+
+        self.hits = set()
+        self.torpedos_used = 0
+        self.lives_left = 0
+        self._afloat = 0
+
+        self._spawn_ships(presets=self.ship_config)
+
+
+
+    ##################
+    # Public behaviors
+
+    def torpedo(self, coordinates):
+        """ Launch attack on coordinate (i, j).  Coordinate is tuple of ints
+
+            Return 0 for miss.  1 for hit.
+            Hitting a location already torpedo'd is a miss.
+        """
+
+        i, j = coordinates
+        i, j = int(i), int(j)
+        if (i < 0) or (j < 0) or (i >= self.dim) or (j >= self.dim):
+            return ValueError("Provided coordinates are invalid")
+
+        self.torpedos_used += 1
+
+        k = i * self.dim + j
+        idx = self._cell_ship.get(k)
+
+        # ocean, or a repeated hit
+        if idx is None or k in self.hits:
+            return 0
+
+        # success case
+        self.hits.add(k)
+        self.lives_left -= 1
+        hit_ship = self.ships[idx]
+        hit_ship.ouch()
+        if hit_ship.life_points == 0:
+            self._afloat -= 1
+
+        return 1
+
+
+    def score(self):
+        """ Returns int of torpedos used.  Essentially a score on the game
+        """
+        return self.torpedos_used
+
+
+    def check_gameover(self):
+        """ Check gameover condition (all ships sunk).
+        """
+        return self.lives_left == 0
+
+
+    def ships_afloat_count(self):
+        """ Returns number of ships remaining on the board and total lives left
+        """
+        return self._afloat, self.lives_left
+
+
+    def ship_cells(self):
+        """ (cells, ships) int64 arrays: flat index i * dim + j of every ship cell and
+            the index of the ship on it, without building the dense grid
+        """
+        cells = np.fromiter(self._cell_ship.keys(), dtype=np.int64, count=len(self._cell_ship))
+        ships = np.fromiter(self._cell_ship.values(), dtype=np.int64, count=len(self._cell_ship))
+        return cells, ships
+
+
+    def print(self):
+        """ Grid as np.array: 0 for ocean, +Z for ship locations, -Z for hit ships
+        """
+        grid = np.zeros(self.dim * self.dim, dtype=np.int32)
+        cells, ships = self.ship_cells()
+        grid[cells] = ships + 1
+        if self.hits:
+            hits = np.fromiter(self.hits, dtype=np.int64, count=len(self.hits))
+            grid[hits] = -grid[hits]
+
+        return grid.reshape(self.dim, self.dim)
+
+
+    @property
+    def grid(self):
+        return self.print()
+
+
+    def snapshot(self):
+        """ Game state as a tuple: torpedos used, ships afloat, lives left, hit cells, life points
+        """
+        return (self.torpedos_used, self._afloat, self.lives_left, frozenset(self.hits)) + tuple(self._lives)
+
+
+    def restore(self, snapshot):
+        """ Rewinds the game to a snapshot() of this board
+        """
+        self.torpedos_used, self._afloat, self.lives_left = snapshot[:3]
+        self.hits = set(snapshot[3])
+        self._lives[:] = snapshot[4:]
+
+
+    def clone(self):
+        """ Copy of the board.  The layout is immutable and shared, only the
+            hits and life points are copied
+        """
+        other = SparseBoard.__new__(SparseBoard)
+        other.__dict__.update(self.__dict__)
+        other.hits = set(self.hits)
+        other._lives = list(self._lives)
+        other.ships = [Ship(name=ship.name, size=ship.size, head_loc=ship.head_loc, orient=ship.orient)
+                       for ship in self.ships]
+        for k, ship in enumerate(other.ships):
+            ship._bind(other._lives, k)
+        return other
+
+
+
+    ##################
+    # Private behaviors
+
+    def _spawn_ships(self, presets='default'):
+        """ Spawn ships on the grid
+
+            presets defines ship configuration.
+            placement and orientation is uniform random across the grid.
+        """
+
+        fleet = resolve_fleet(presets, self.dim)
+        if fleet is not None:
+            for name, size in fleet:
+                self._spawn_ship_random(name, size)
+
+        elif isinstance(presets[0], Ship):
+            for ship in presets:
+                # Fresh copies, torpedo() decrements life_points
+                ship = Ship(name=ship.name, size=ship.size, head_loc=ship.head_loc, orient=ship.orient)
+                cells = self._ship_cells(ship.head_loc, ship.orient, ship.size)
+                if cells is None:
+                    raise ValueError(f"{ship} does not fit on the board")
+                self._place_ship(ship, cells)
+
+        else:
+            raise ValueError("Input presets into _spawn_ships() is not valid")
+
+
+    def _spawn_ship_random(self, name, size):
+        """ Spawns a ship.  Uniform random among the placements left free
+        """
+
+        head, orient, cells = random_placement(self.dim, size, self._cell_ship)
+        ship = Ship(name=name, size=size, head_loc=head, orient=orient)
+        self._place_ship(ship, cells)
+
+
+    def _ship_cells(self, head_pos, orient, size):
+        """ Flat cells of a ship placement, None if it leaves the grid or overlaps a ship
+        """
+
+        i, j = int(head_pos[0]), int(head_pos[1])
+        di, dj = STEPS[orient]
+        i_end, j_end = i + di * (size - 1), j + dj * (size - 1)
+        if not (0 <= min(i, i_end) and max(i, i_end) < self.dim and
+                0 <= min(j, j_end) and max(j, j_end) < self.dim):
+            return None
+
+        cells = [(i + di * step) * self.dim + j + dj * step for step in range(size)]
+        if any(cell in self._cell_ship for cell in cells):
+            return None
+        return cells
+
+
+    def _place_ship(self, ship, cells):
+        """ Adds ship to the cell index
+        """
+
+        idx = len(self.ships)
+        self._lives.append(ship.life_points)
+        ship._bind(self._lives, idx)
+        self.ships.append(ship)
+        self.lives_left += ship.life_points
+        self._afloat += 1
+
+        for cell in cells:
+            self._cell_ship[cell] = idx
+
+
+    def _is_position_valid(self, pos):
+        """ Checks if pos = (i, j) lies on the grid
+        """
+        i, j = pos
+        return 0 <= i < self.dim and 0 <= j < self.dim
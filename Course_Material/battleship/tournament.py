@@ -0,0 +1,205 @@
+""" Tournament
+
+Plays many games per agent across a process pool and summarizes the score
+distributions.  Run from Course_Material:
+
+    python -m battleship.tournament trivial less_trivial density --games 1000000
+
+Agents are given as
+    trivial, less_trivial, density  -- the agents of this package
+    module:Class  -- any class built as Class(board) with play_until_completion()
+    rl:ALGO:path  -- RLAgent with a stable_baselines3 ALGO model saved at path
+
+Games are split in chunks of --chunk games, and chunk k of an agent always
+gets the k-th child of np.random.SeedSequence(seed), so the results do not
+depend on the number of workers.  Every agent plays the same boards.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+AGENTS = {
+    'trivial': 'battleship.trivial_agent:TrivialAgent',
+    'less_trivial': 'battleship.less_trivial_agent:LessTrivialAgent',
+    'density': 'battleship.density_agent:DensityAgent',
+}
+
+BOARDS = {
+    'board': 'battleship.board:Board',
+    'bitboard': 'battleship.bitboard:BitBoard',
+    'sparse': 'battleship.sparse_board:SparseBoard',
+}
+
+# z of a two sided 95% confidence interval
+Z_95 = 1.959963984540054
+
+# RL models loaded in this process, by (algo, path)
+_MODELS = dict()
+
+
+def _import(path):
+    module, name = path.split(':')
+    return getattr(importlib.import_module(module), name)
+
+
+def make_agent(spec, board):
+    """ Agent playing board, from an agent spec as described in the module docstring
+    """
+
+    if spec.startswith('rl:'):
+        _, algo, path = spec.split(':', 2)
+        if (algo, path) not in _MODELS:
+            import stable_baselines3
+            _MODELS[(algo, path)] = getattr(stable_baselines3, algo).load(path)
+
+        from battleship import RLAgent
+        from BattleshipGymTemplate import BattleshipEnvClass
+        return RLAgent(board, _MODELS[(algo, path)], BattleshipEnvClass(board_dim=board.dim))
+
+    return _import(AGENTS.get(spec, spec))(board)
+
+
+def play_chunk(spec, board_name, dim, seed_seq, n_games):
+    """ Plays n_games, game k with the global RNGs seeded from the k-th word of seed_seq.
+
+        Returns the bincount of the scores and the seconds spent.
+    """
+
+    game_seeds = seed_seq.generate_state(n_games)
+    board_cls = _import(BOARDS[board_name])
+    scores = np.zeros(n_games, dtype=np.int64)
+
+    start = time.perf_counter()
+    for k in range(n_games):
+        # Board and agent draw from the global RNGs, seeding per game gives every agent the same boards
+        np.random.seed(game_seeds[k])
+        random.seed(int(game_seeds[k]))
+        board = board_cls(dim=dim, vis=False)
+        score = make_agent(spec, board).play_until_completion()
+        # RLAgent returns (score, episode_reward)
+        scores[k] = score[0] if isinstance(score, tuple) else score
+
+    return np.bincount(scores), time.perf_counter() - start
+
+
+def summarize(hist):
+    """ Mean, std, 95% CI of the mean and quantiles of a score histogram
+    """
+
+    scores = np.arange(len(hist))
+    n = int(hist.sum())
+    mean = float((hist * scores).sum() / n)
+    std = float(np.sqrt((hist * (scores - mean) ** 2).sum() / max(n - 1, 1)))
+    half_width = Z_95 * std / np.sqrt(n)
+    cdf = np.cumsum(hist) / n
+
+    return {
+        'games': n,
+        'mean': mean,
+        'std': std,
+        'ci95': [mean - half_width, mean + half_width],
+        'min': int(np.flatnonzero(hist)[0]),
+        'median': int(np.searchsorted(cdf, 0.5)),
+        'p90': int(np.searchsorted(cdf, 0.9)),
+        'max': int(np.flatnonzero(hist)[-1]),
+    }
+
+
+def compare(a, b):
+    """ Difference of the means of two summaries with its 95% CI (Welch)
+    """
+    diff = a['mean'] - b['mean']
+    half_width = Z_95 * np.sqrt(a['std'] ** 2 / a['games'] + b['std'] ** 2 / b['games'])
+    return {'diff': diff, 'ci95': [diff - half_width, diff + half_width],
+            'significant': bool(abs(diff) > half_width)}
+
+
+def run_tournament(specs, games, seed=0, chunk=1000, jobs=0, board='bitboard', dim=10, verbose=True):
+    """ Plays games games with every agent in specs.
+
+        Returns {spec: histogram} and {spec: summary}, the summaries also hold
+        the wall clock and summed worker seconds.
+    """
+
+    n_chunks = -(-games // chunk)
+    sizes = [min(chunk, games - k * chunk) for k in range(n_chunks)]
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+
+    hists, summaries = dict(), dict()
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        for spec in specs:
+            start = time.perf_counter()
+            futures = [pool.submit(play_chunk, spec, board, dim, seed_seq, n_games)
+                       for seed_seq, n_games in zip(seeds, sizes)]
+
+            hist = np.zeros(1, dtype=np.int64)
+            worker_seconds = 0.
+            for future in futures:
+                chunk_hist, seconds = future.result()
+                if len(chunk_hist) > len(hist):
+                    hist = np.pad(hist, (0, len(chunk_hist) - len(hist)))
+                hist[:len(chunk_hist)] += chunk_hist
+                worker_seconds += seconds
+
+            hists[spec] = hist
+            summaries[spec] = summarize(hist)
+            summaries[spec]['wall_seconds'] = time.perf_counter() - start
+            summaries[spec]['worker_seconds'] = worker_seconds
+            summaries[spec]['games_per_second'] = games / summaries[spec]['wall_seconds']
+
+            if verbose:
+                s = summaries[spec]
+                print(f"{spec:>20}: mean {s['mean']:7.3f} [{s['ci95'][0]:7.3f}, {s['ci95'][1]:7.3f}]"
+                      f"  median {s['median']:3d}  {s['games_per_second']:9.0f} games/s")
+
+    return hists, summaries
+
+
+def save_results(out, hists, summaries, args):
+    """ Writes out.npz with the score histogram of the k-th agent as hist_k, and out.json with the summaries
+    """
+
+    if os.path.dirname(out) and not os.path.exists(os.path.dirname(out)):
+        os.makedirs(os.path.dirname(out))
+
+    specs = list(hists)
+    np.savez_compressed(out + '.npz', **{f'hist_{k}': hists[spec] for k, spec in enumerate(specs)})
+
+    pairs = {f'{a} - {b}': compare(summaries[a], summaries[b])
+             for k, a in enumerate(specs) for b in specs[k + 1:]}
+    with open(out + '.json', 'w') as f:
+        json.dump({'args': args, 'agents': specs, 'summaries': summaries, 'differences': pairs}, f, indent=2)
+
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(prog='python -m battleship.tournament')
+    parser.add_argument('agents', nargs='+')                          # Agent specs, see the module docstring
+    parser.add_argument('--games', default=100000, type=int)         # Games per agent
+    parser.add_argument('--seed', default=0, type=int)
+    parser.add_argument('--chunk', default=1000, type=int)           # Games per task sent to a worker
+    parser.add_argument('--jobs', default=0, type=int)               # Worker processes, 0 uses every core
+    parser.add_argument('--board', default='bitboard', choices=list(BOARDS))
+    parser.add_argument('--dim', default=10, type=int)
+    parser.add_argument('--out', default='./results/tournament')     # Writes <out>.npz and <out>.json
+    args = parser.parse_args()
+
+    hists, summaries = run_tournament(args.agents, args.games, args.seed, args.chunk, args.jobs, args.board, args.dim)
+
+    specs = list(summaries)
+    for k, a in enumerate(specs):
+        for b in specs[k + 1:]:
+            c = compare(summaries[a], summaries[b])
+            print(f"{a} - {b}: {c['diff']:+.3f} [{c['ci95'][0]:+.3f}, {c['ci95'][1]:+.3f}]")
+
+    save_results(args.out, hists, summaries, vars(args))
+    print(f"Saved {args.out}.npz and {args.out}.json")
@@ -0,0 +1,280 @@
+""" Traces
+
+Records games as ship layouts plus shot sequences in a columnar format, generates
+them in bulk across processes, and turns them into (observation, action)
+batches for behaviour cloning the policy behind RLAgent.  Run from Course_Material:
+
+    python -m battleship.traces density --games 1000000 --out traces/density
+
+A trace directory holds one .npy file per column, loaded memory-mapped:
+    game_offsets (G + 1,) int64 -- shots of game g are [game_offsets[g], game_offsets[g + 1])
+    shot_cell (N,) uint16 -- cell i * dim + j of each shot, in game order
+    shot_outcome (N,) uint8 -- 0 miss, 1 hit, 2 hit that sank a ship
+    ship_offsets (G + 1,) int64 -- ships of game g, as for the shots
+    ship_head (S, 2) uint16, ship_size (S,) uint8, ship_orient (S,) uint8 (Direction.value)
+and meta.json with dim, the agent and the seed.  shot_cell and ship_head are
+uint32 instead when dim > 256, where cells no longer fit in 16 bits.
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .tournament import BOARDS, _import, make_agent
+
+
+MISS, HIT, SUNK = 0, 1, 2
+
+def cell_dtype(dim):
+    """ Smallest unsigned dtype holding every cell index i * dim + j of a dim x dim board
+    """
+    return np.uint16 if dim * dim <= 1 << 16 else np.uint32
+
+
+COLUMNS = ['game_offsets', 'shot_cell', 'shot_outcome',
+           'ship_offsets', 'ship_head', 'ship_size', 'ship_orient']
+
+
+class TraceRecorder():
+    """ Stands in for a board and logs every torpedo fired through it.
+
+        Agents are built on the recorder instead of the board, everything but
+        torpedo() is forwarded to the board unchanged.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.cells = list()
+        self.outcomes = list()
+        self._afloat = board.ships_afloat_count()[0]
+
+
+    def torpedo(self, coordinates):
+        hit = self.board.torpedo(coordinates)
+        if isinstance(hit, Exception):
+            return hit
+
+        i, j = coordinates
+        self.cells.append(int(i) * self.board.dim + int(j))
+        if hit:
+            afloat = self.board.ships_afloat_count()[0]
+            self.outcomes.append(SUNK if afloat < self._afloat else HIT)
+            self._afloat = afloat
+        else:
+            self.outcomes.append(MISS)
+        return hit
+
+
+    def __getattr__(self, name):
+        return getattr(self.board, name)
+
+
+def record_chunk(spec, board_name, dim, seed_seq, n_games):
+    """ Plays n_games as tournament.play_chunk() does and returns their traces
+        as a dict of columns, offsets starting at 0
+    """
+
+    game_seeds = seed_seq.generate_state(n_games)
+    board_cls = _import(BOARDS[board_name])
+
+    cells, outcomes, heads, sizes, orients = [], [], [], [], []
+    game_lengths = np.zeros(n_games, dtype=np.int64)
+    ship_counts = np.zeros(n_games, dtype=np.int64)
+
+    for k in range(n_games):
+        np.random.seed(game_seeds[k])
+        random.seed(int(game_seeds[k]))
+        board = board_cls(dim=dim, vis=False)
+        recorder = TraceRecorder(board)
+        make_agent(spec, recorder).play_until_completion()
+
+        cells.extend(recorder.cells)
+        outcomes.extend(recorder.outcomes)
+        game_lengths[k] = len(recorder.cells)
+        for ship in board.ships:
+            heads.append(tuple(int(x) for x in ship.head_loc))
+            sizes.append(ship.size)
+            orients.append(ship.orient.value)
+        ship_counts[k] = len(board.ships)
+
+    return {
+        'game_offsets': np.concatenate([[0], np.cumsum(game_lengths)]),
+        'shot_cell': np.array(cells, dtype=cell_dtype(dim)),
+        'shot_outcome': np.array(outcomes, dtype=np.uint8),
+        'ship_offsets': np.concatenate([[0], np.cumsum(ship_counts)]),
+        'ship_head': np.array(heads, dtype=cell_dtype(dim)).reshape(-1, 2),
+        'ship_size': np.array(sizes, dtype=np.uint8),
+        'ship_orient': np.array(orients, dtype=np.uint8),
+    }
+
+
+def concat_traces(chunks):
+    """ One set of columns from several, offsets shifted to follow each other
+    """
+    traces = dict()
+    for name in ('game_offsets', 'ship_offsets'):
+        ends = np.cumsum([0] + [chunk[name][-1] for chunk in chunks[:-1]])
+        traces[name] = np.concatenate([[0]] + [chunk[name][1:] + end for chunk, end in zip(chunks, ends)])
+    for name in COLUMNS:
+        if name not in traces:
+            traces[name] = np.concatenate([chunk[name] for chunk in chunks])
+    return traces
+
+
+def save_traces(path, traces, meta):
+    """ Writes the columns as path/<column>.npy and meta as path/meta.json
+    """
+    if not os.path.exists(path):
+        os.makedirs(path)
+    for name in COLUMNS:
+        np.save(os.path.join(path, name + '.npy'), traces[name])
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+
+def load_traces(path, mmap_mode='r'):
+    """ Columns and meta of a trace directory, the columns memory-mapped by default
+    """
+    traces = {name: np.load(os.path.join(path, name + '.npy'), mmap_mode=mmap_mode) for name in COLUMNS}
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    return traces, meta
+
+
+def generate_traces(spec, games, out, seed=0, chunk=1000, jobs=0, board='bitboard', dim=10):
+    """ Records games games of the agent spec (see battleship.tournament) across
+        a process pool into the trace directory out.  Seeded as the tournament,
+        so the traces are the games the tournament scores.
+    """
+
+    n_chunks = -(-games // chunk)
+    sizes = [min(chunk, games - k * chunk) for k in range(n_chunks)]
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        futures = [pool.submit(record_chunk, spec, board, dim, seed_seq, n_games)
+                   for seed_seq, n_games in zip(seeds, sizes)]
+        traces = concat_traces([future.result() for future in futures])
+
+    meta = {'dim': dim, 'agent': spec, 'board': board, 'seed': seed, 'games': games,
+            'shots': int(traces['game_offsets'][-1])}
+    save_traces(out, traces, meta)
+    return traces, meta
+
+
+
+class TraceDataset():
+    """ (observation, action) pairs of every shot in a trace directory.
+
+        The observation before a shot is BattleshipEnvClass's state:
+        (dim, dim) with 1 for hits and -1 for misses so far in the game, and
+        the action is the env's index of the cell shot, i + j * dim.
+        Observations are rebuilt from the shot columns per batch, so a
+        dataset of millions of games needs no more memory than its traces.
+
+        A batch is built from the shots before each sample, padded to the
+        longest game, and holds dense observations: O(B * dim * dim) time and
+        memory per batch, which limits it to small boards.  Behaviour cloning
+        on boards of 100 x 100 and up needs a sparser observation.
+    """
+
+    def __init__(self, path):
+        self.traces, self.meta = load_traces(path)
+        self.dim = self.meta['dim']
+        self.offsets = np.asarray(self.traces['game_offsets'])
+        self.max_length = int(np.diff(self.offsets).max())
+
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+
+    def get_batch(self, shots, dtype=np.int32):
+        """ Observations (B, dim, dim) and actions (B,) of the shots with global index shots
+        """
+        shots = np.asarray(shots)
+        dim = self.dim
+        games = np.searchsorted(self.offsets, shots, side='right') - 1
+        starts = self.offsets[games]
+
+        # The shots of the same game before each shot, padded to the longest game
+        steps = np.arange(self.max_length)
+        before = steps[None, :] < (shots - starts)[:, None]
+        prior = np.minimum(starts[:, None] + steps[None, :], len(self) - 1)
+
+        cell = np.asarray(self.traces['shot_cell'])
+        outcome = np.asarray(self.traces['shot_outcome'])
+        rows, k = np.nonzero(before)
+        obs = np.zeros((len(shots), dim * dim), dtype=dtype)
+        obs[rows, cell[prior[rows, k]]] = np.where(outcome[prior[rows, k]] == MISS, -1, 1)
+
+        i, j = np.divmod(cell[shots].astype(np.int64), dim)
+        return obs.reshape(-1, dim, dim), i + j * dim
+
+
+    def batches(self, batch_size=256, shuffle=True, seed=None, dtype=np.int32):
+        """ Iterates over the whole dataset in batches of (observations, actions)
+        """
+        order = np.random.default_rng(seed).permutation(len(self)) if shuffle else np.arange(len(self))
+        for start in range(0, len(order), batch_size):
+            yield self.get_batch(np.sort(order[start:start + batch_size]), dtype)
+
+
+
+def pretrain_policy(model, dataset, epochs=1, batch_size=256, seed=None, verbose=True):
+    """ Behaviour cloning: maximizes the log likelihood of the dataset's actions
+        under the policy of a stable_baselines3 actor-critic model (PPO, A2C),
+        with the policy's own optimizer.  Returns the mean loss of each epoch.
+    """
+
+    import torch
+
+    policy = model.policy
+    policy.set_training_mode(True)
+    losses = list()
+    for epoch in range(epochs):
+        total, n = 0., 0
+        for obs, actions in dataset.batches(batch_size, seed=None if seed is None else seed + epoch):
+            obs_tensor, _ = policy.obs_to_tensor(obs)
+            actions_tensor = torch.as_tensor(actions, device=policy.device)
+            _, log_prob, _ = policy.evaluate_actions(obs_tensor, actions_tensor)
+            loss = -log_prob.mean()
+
+            policy.optimizer.zero_grad()
+            loss.backward()
+            policy.optimizer.step()
+            total += float(loss) * len(actions)
+            n += len(actions)
+
+        losses.append(total / n)
+        if verbose:
+            print(f"Epoch {epoch + 1}/{epochs}: negative log likelihood {losses[-1]:.4f}")
+
+    policy.set_training_mode(False)
+    return losses
+
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(prog='python -m battleship.traces')
+    parser.add_argument('agent')                                     # Agent spec, see battleship.tournament
+    parser.add_argument('--games', default=100000, type=int)
+    parser.add_argument('--seed', default=0, type=int)
+    parser.add_argument('--chunk', default=1000, type=int)           # Games per task sent to a worker
+    parser.add_argument('--jobs', default=0, type=int)               # Worker processes, 0 uses every core
+    parser.add_argument('--board', default='bitboard', choices=list(BOARDS))
+    parser.add_argument('--dim', default=10, type=int)
+    parser.add_argument('--out', default='./traces/trace')           # Trace directory
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    traces, meta = generate_traces(args.agent, args.games, args.out, args.seed, args.chunk, args.jobs, args.board, args.dim)
+    size = sum(os.path.getsize(os.path.join(args.out, name + '.npy')) for name in COLUMNS)
+    print(f"{meta['games']} games, {meta['shots']} shots in {time.perf_counter() - start:.1f} s, "
+          f"{size / meta['games']:.0f} bytes per game, saved to {args.out}")
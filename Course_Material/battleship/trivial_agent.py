@@ -3,6 +3,7 @@
 
 import numpy as np 
 from battleship  import Board 
+from .sampler import UnprobedSampler 
 
 
 class TrivialAgent(): 
@@ -16,6 +17,7 @@ class TrivialAgent():
 
         dim = self.board.dim 
         self.agnt_grid = np.zeros(shape=(dim, dim))
+        self.unprobed = UnprobedSampler(dim) 
 
 
     def play_until_completion(self, debug=False): 
@@ -31,13 +33,12 @@ class TrivialAgent():
 
     def _random_probe(self, debug=False): 
 
-        probe_here = np.random.randint(0, self.board.dim, size=2) 
+        probe_here = self.unprobed.sample_coords() 
         i, j = probe_here
-        if self.agnt_grid[i, j] == 0: 
-            if debug: 
-                print(f"Probing {probe_here}. Selected randomly")
-            self.board.torpedo(probe_here) 
-            self.agnt_grid[i, j] = 1 
+        if debug: 
+            print(f"Probing {probe_here}. Selected randomly")
+        self.board.torpedo(probe_here) 
+        self.agnt_grid[i, j] = 1 
 
 
 
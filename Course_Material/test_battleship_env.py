@@ -0,0 +1,88 @@
+""" Builds and plays BattleshipEnvClass and BattleshipVecEnv for every board size
+and ship_config their docstrings offer.  Run from Course_Material: python -m pytest
+"""
+
+import numpy as np
+import pytest
+
+from battleship import Board, BitBoard, SparseBoard
+from battleship.placement import resolve_fleet
+from battleship.static_board_v1 import ship_config as static_ships
+from BattleshipGymTemplate import BattleshipEnvClass, BattleshipVecEnv, BOARD_DIM, SPARSE_DIM
+
+BOARD_DIMS = [BOARD_DIM, 20, SPARSE_DIM, SPARSE_DIM + 1, 100, 1000]
+VEC_BOARD_DIMS = [BOARD_DIM, 20, SPARSE_DIM, SPARSE_DIM + 1, 100]
+SHIP_CONFIGS = {
+    'default': 'default',
+    'scaled': 'scaled',
+    'pairs': [('destroyer', 2), ('destroyer', 2), ('carrier', 5)],
+    'ships': static_ships,
+}
+
+
+def fleet_lives(ship_config, dim):
+    fleet = resolve_fleet(ship_config, dim)
+    if fleet is None:
+        return sum(ship.size for ship in ship_config)
+    return sum(size for _name, size in fleet)
+
+
+@pytest.mark.parametrize('config', SHIP_CONFIGS)
+@pytest.mark.parametrize('board_dim', BOARD_DIMS)
+def test_env(board_dim, config):
+    ship_config = SHIP_CONFIGS[config]
+    env = BattleshipEnvClass(board_dim=board_dim, ship_config=ship_config)
+    env.seed(0)
+    obs = env.reset()
+
+    assert obs.shape == (board_dim, board_dim)
+    assert obs.dtype == (np.int32 if board_dim <= SPARSE_DIM else np.int8)
+    assert env.board.ships_afloat_count()[1] == fleet_lives(ship_config, board_dim)
+
+    # Shoot the ship cells, the game ends on the last one
+    grid = env.board.print()
+    cells = np.flatnonzero(grid.T > 0)
+    for n, action in enumerate(cells, 1):
+        obs, reward, done, info = env.step(action)
+        assert reward == 1
+        assert done == (n == len(cells))
+    assert obs.sum() == len(cells)
+
+
+@pytest.mark.parametrize('config', SHIP_CONFIGS)
+@pytest.mark.parametrize('board_dim', VEC_BOARD_DIMS)
+def test_vec_env(board_dim, config):
+    ship_config = SHIP_CONFIGS[config]
+    env = BattleshipVecEnv(num_envs=4, board_dim=board_dim, ship_config=ship_config)
+    env.seed(0)
+    obs = env.reset()
+
+    assert obs.shape == (4, board_dim, board_dim)
+    lives = fleet_lives(ship_config, board_dim)
+    assert ((env.board.grid > 0).sum(axis=(1, 2)) == lives).all()
+
+    obs, rewards, dones, infos = env.step(np.zeros(4, dtype=np.int64))
+    assert obs.shape == (4, board_dim, board_dim)
+    assert len(rewards) == len(dones) == len(infos) == 4
+
+
+
+@pytest.mark.parametrize('config', SHIP_CONFIGS)
+@pytest.mark.parametrize('board_cls', [Board, BitBoard, SparseBoard])
+def test_board_ship_config(board_cls, config):
+    ship_config = SHIP_CONFIGS[config]
+    board = board_cls(dim=20, ship_config=ship_config, vis=False)
+    assert board.ships_afloat_count() == (len(board.ships), fleet_lives(ship_config, 20))
+    assert (board.grid > 0).sum() == fleet_lives(ship_config, 20)
+
+    with pytest.raises(ValueError):
+        board_cls(dim=20, ship_config='huge', vis=False)
+
+
+@pytest.mark.parametrize('board_cls', [Board, BitBoard, SparseBoard])
+def test_invalid_coordinates(board_cls):
+    # torpedo() returns the ValueError for shots off the grid and does not count them
+    board = board_cls(dim=BOARD_DIM, vis=False)
+    assert isinstance(board.torpedo((BOARD_DIM, 0)), ValueError)
+    assert isinstance(board.torpedo((0, -1)), ValueError)
+    assert board.score() == 0
@@ -72,7 +72,8 @@ class TD3(object):
             tau=0.005,
             policy_noise=0.2,
             noise_clip=0.5,
-            policy_freq=2
+            policy_freq=2,
+            bc_alpha=None
     ):
 
         self.actor = Actor(state_dim, action_dim, max_action).to(device)
@@ -89,6 +90,7 @@ class TD3(object):
         self.policy_noise = policy_noise
         self.noise_clip = noise_clip
         self.policy_freq = policy_freq
+        self.bc_alpha = bc_alpha
 
         self.total_it = 0
 
@@ -132,7 +134,15 @@ class TD3(object):
         if self.total_it % self.policy_freq == 0:
 
             # Compute actor losse
-            actor_loss = -self.critic.Q1(state, self.actor(state)).mean()
+            if self.bc_alpha is None:
+                actor_loss = -self.critic.Q1(state, self.actor(state)).mean()
+            else:
+                # Behaviour cloning regulariser for offline training (TD3+BC)
+                # Paper: https://arxiv.org/abs/2106.06860
+                pi = self.actor(state)
+                Q = self.critic.Q1(state, pi)
+                lmbda = self.bc_alpha / Q.abs().mean().detach()
+                actor_loss = -lmbda * Q.mean() + F.mse_loss(pi, action)
 
             # Optimize the actor
             self.actor_optimizer.zero_grad()
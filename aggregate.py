@@ -0,0 +1,195 @@
+import argparse
+import glob
+import hashlib
+import os
+import pickle
+import re
+import warnings
+
+import numpy as np
+
+
+# Aggregates the evaluation curves saved by main.py (learning_curves/ and results/) over seeds
+# All runs of all envs are stacked into one (runs, seeds, evaluations) array padded with NaN,
+# so every statistic and every bootstrap resample is computed for all envs at once.
+# Interval estimates follow "Deep RL at the Edge of the Statistical Precipice"
+# Paper: https://arxiv.org/abs/2108.13264
+
+DEFAULT_ROOTS = ("./learning_curves", "./results")
+
+# {policy}_{env}_{seed}[_{run_tag}].npy, as written by main.py
+RUN_PATTERN = re.compile(r"^(?P<policy>[^_]+)_(?P<env>.+?)_(?P<seed>\d+)(?:_(?P<tag>.+))?\.npy$")
+
+
+def discover_runs(roots=DEFAULT_ROOTS):
+    # Returns {(policy, env, run_tag): [path, ...]} with paths sorted by seed
+    runs = {}
+    for root in roots:
+        for path in sorted(glob.glob(os.path.join(root, "**", "*.npy"), recursive=True)):
+            match = RUN_PATTERN.match(os.path.basename(path))
+            if match is None:
+                continue
+            key = (match["policy"], match["env"], match["tag"] or "")
+            runs.setdefault(key, []).append((int(match["seed"]), path))
+    return {key: [path for _, path in sorted(paths)] for key, paths in sorted(runs.items())}
+
+
+def load_curves(runs):
+    # Stacks every curve into a (groups, seeds, evaluations) array, NaN where a run is shorter or missing
+    curves = [[np.load(path, mmap_mode="r") for path in paths] for paths in runs.values()]
+    n_seeds = max(len(group) for group in curves)
+    n_evals = max(len(curve) for group in curves for curve in group)
+
+    data = np.full((len(curves), n_seeds, n_evals), np.nan)
+    for g, group in enumerate(curves):
+        for s, curve in enumerate(group):
+            data[g, s, :len(curve)] = curve
+    return data
+
+
+def nan_iqm(x, axis):
+    # Interquartile mean ignoring NaN: mean of the values ranked in the middle 50% along axis
+    x = np.sort(np.moveaxis(x, axis, -1), axis=-1)  # NaN are sorted last
+    n = np.sum(~np.isnan(x), axis=-1, keepdims=True)
+    cut = n // 4
+    rank = np.arange(x.shape[-1])
+    inner = (rank >= cut) & (rank < n - cut)
+    with np.errstate(invalid="ignore"):
+        return np.where(inner, x, 0.).sum(axis=-1) / inner.sum(axis=-1)
+
+
+def stratified_bootstrap(data, n_runs, statistics, n_boot=1000, seed=0, chunk_bytes=64 * 2**20):
+    # Resamples the seeds of every group independently (the strata), n_boot times
+    # Returns {name: (n_boot, groups, evaluations)} for every statistic(resampled, axis)
+    rng = np.random.default_rng(seed)
+    groups, n_seeds, n_evals = data.shape
+    chunk = max(1, chunk_bytes // (data.nbytes or 1))
+    group_idx = np.arange(groups)[None, :, None]
+
+    results = {name: [] for name in statistics}
+    for start in range(0, n_boot, chunk):
+        size = min(chunk, n_boot - start)
+        seed_idx = (rng.random((size, groups, n_seeds)) * n_runs[None, :, None]).astype(int)
+        resampled = data[group_idx, seed_idx]  # (size, groups, seeds, evaluations)
+        for name, statistic in statistics.items():
+            results[name].append(statistic(resampled, axis=2))
+    return {name: np.concatenate(values) for name, values in results.items()}
+
+
+def pooled_iqm(x, axis):
+    # IQM over the groups and seeds together, x is (..., groups, seeds, evaluations) with seeds on axis
+    return nan_iqm(x.reshape(x.shape[:axis - 1] + (-1,) + x.shape[axis + 1:]), axis=axis - 1)
+
+
+def summarize(data, n_runs, n_boot=1000, confidence=0.95, seed=0, pooled=False):
+    # Per group mean, std and IQM with bootstrap intervals, or with pooled=True only the IQM over all groups
+    if pooled:
+        statistics = {"iqm": pooled_iqm}
+    else:
+        statistics = {"mean": np.nanmean, "iqm": nan_iqm}
+
+    with warnings.catch_warnings(), np.errstate(invalid="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN slices past the end of shorter runs
+        boot = stratified_bootstrap(data, n_runs, statistics, n_boot, seed)
+        summary = {name: statistic(data[None], axis=2)[0] for name, statistic in statistics.items()}
+        if not pooled:
+            summary["std"] = np.nanstd(data, axis=1)
+        for name in statistics:
+            quantiles = [(1 - confidence) / 2, (1 + confidence) / 2]
+            summary[f"{name}_low"], summary[f"{name}_high"] = np.nanquantile(boot[name], quantiles, axis=0)
+    return summary
+
+
+def normalize(data):
+    # Min-max normalises every group over all its seeds and evaluations, so groups can be pooled
+    low = np.nanmin(data, axis=(1, 2), keepdims=True)
+    high = np.nanmax(data, axis=(1, 2), keepdims=True)
+    return (data - low) / np.where(high > low, high - low, 1.)
+
+
+def cache_key(runs, **params):
+    h = hashlib.sha1()
+    for paths in runs.values():
+        for path in paths:
+            stat = os.stat(path)
+            h.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+    h.update(repr(sorted(params.items())).encode())
+    return h.hexdigest()
+
+
+def aggregate(roots=DEFAULT_ROOTS, eval_freq=5000, n_boot=1000, confidence=0.95, seed=0, cache_dir="./.aggregate_cache"):
+    # Returns {(policy, env, run_tag): stats} and, when there are several groups, the IQM of the
+    # min-max normalised scores pooled over all of them under the key "all".
+    # Results are cached on the files' mtimes, re-running with unchanged files only reads the cache.
+    runs = discover_runs(roots)
+    if not runs:
+        raise ValueError(f"No runs found under {', '.join(roots)}")
+
+    key = cache_key(runs, eval_freq=eval_freq, n_boot=n_boot, confidence=confidence, seed=seed)
+    cache_file = os.path.join(cache_dir, key + ".pkl") if cache_dir else None
+    if cache_file and os.path.exists(cache_file):
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+
+    data = load_curves(runs)
+    n_runs = np.array([len(paths) for paths in runs.values()])
+    summary = summarize(data, n_runs, n_boot, confidence, seed)
+    timesteps = np.arange(data.shape[2]) * eval_freq
+
+    results = {}
+    for g, group in enumerate(runs):
+        valid = ~np.all(np.isnan(data[g]), axis=0)
+        results[group] = {name: values[g][valid] for name, values in summary.items()}
+        results[group]["timesteps"] = timesteps[valid]
+        results[group]["n_seeds"] = int(n_runs[g])
+
+    if len(runs) > 1:
+        # Aggregate IQM as in rliable: all normalised scores pooled, seeds resampled within each group
+        pooled = summarize(normalize(data), n_runs, n_boot, confidence, seed, pooled=True)
+        valid = ~np.isnan(pooled["iqm"])
+        results["all"] = {name: values[valid] for name, values in pooled.items()}
+        results["all"]["timesteps"] = timesteps[valid]
+
+    if cache_file:
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        with open(cache_file, "wb") as f:
+            pickle.dump(results, f)
+    return results
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--roots", nargs="+", default=list(DEFAULT_ROOTS))  # Directories searched recursively for result files
+    parser.add_argument("--eval_freq", default=5000, type=int)            # Time steps between evaluations, as passed to main.py
+    parser.add_argument("--n_boot", default=1000, type=int)               # Bootstrap resamples for the confidence intervals
+    parser.add_argument("--confidence", default=0.95, type=float)
+    parser.add_argument("--plot", default="")                             # Save mean curves with confidence bands to this image
+    args = parser.parse_args()
+
+    results = aggregate(args.roots, args.eval_freq, args.n_boot, args.confidence)
+
+    print(f"{'run':<55} {'seeds':>5} {'final mean':>12} {'std':>9} {'IQM [CI]':>30}")
+    for group, stats in results.items():
+        name = "all (normalised)" if group == "all" else "_".join(part for part in group if part)
+        mean = f"{stats['mean'][-1]:12.1f} {stats['std'][-1]:9.1f}" if "mean" in stats else f"{'':12} {'':9}"
+        iqm = f"{stats['iqm'][-1]:.2f} [{stats['iqm_low'][-1]:.2f}, {stats['iqm_high'][-1]:.2f}]"
+        print(f"{name:<55} {stats.get('n_seeds', ''):>5} {mean} {iqm:>30}")
+
+    if args.plot:
+        import matplotlib.pyplot as plt
+
+        groups = [group for group in results if group != "all"]
+        cols = min(4, len(groups))
+        rows = -(-len(groups) // cols)
+        fig, axes = plt.subplots(rows, cols, figsize=(4 * cols, 3 * rows), squeeze=False)
+        for ax, group in zip(axes.flat, groups):
+            stats = results[group]
+            ax.plot(stats["timesteps"], stats["mean"])
+            ax.fill_between(stats["timesteps"], stats["mean_low"], stats["mean_high"], alpha=0.3)
+            ax.set_title("_".join(part for part in group if part), fontsize=9)
+        for ax in axes.flat[len(groups):]:
+            ax.set_visible(False)
+        fig.tight_layout()
+        fig.savefig(args.plot)
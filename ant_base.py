@@ -0,0 +1,100 @@
+import numpy as np
+
+from pybullet_envs.gym_locomotion_envs import WalkerBaseBulletEnv
+
+
+# Fast reset and action repeat shared by override_ant.MyAntBulletEnv and override_ant_random.MyAntBulletEnv.
+# The envs set fast_reset, stateId and _reward_terms in __init__ and define finish_step(). Their reward
+# terms differ, electricity_term and joints_at_limit_term give where the skipped frames' costs go.
+class FastAntBulletEnv(WalkerBaseBulletEnv):
+
+    electricity_term = 2
+    joints_at_limit_term = 3
+
+    def reset(self):
+        if self.fast_reset and self.stateId >= 0:
+            self.restore_start_state()
+            return self.restart_episode()
+
+        state = WalkerBaseBulletEnv.reset(self)
+
+        # Ids for the single contact query in step() and the joint resets in perturb_joints()
+        foot = self.robot.feet[0]
+        self._robot_id = foot.bodies[foot.bodyIndex]
+        self._foot_links = [f.bodyPartIndex for f in self.robot.feet]
+        self._joint_ids = [j.jointIndex for j in self.robot.ordered_joints]
+        self._joint_mid = np.array([0.5 * (j.lowerLimit + j.upperLimit) for j in self.robot.ordered_joints])
+        self._joint_range = np.array([j.upperLimit - j.lowerLimit for j in self.robot.ordered_joints])
+        return state
+
+    def restore_start_state(self):
+        # The simulator snapshot taken at the first reset, with the joints perturbed as a full reset would
+        self._p.restoreState(self.stateId)
+        self.perturb_joints()
+
+    def perturb_joints(self):
+        # Same start pose as WalkerBase.robot_specific_reset() (and the same random draws), in one call for all joints
+        positions = self.robot.np_random.uniform(low=-0.1, high=0.1, size=len(self._joint_ids))
+        self._p.resetJointStatesMultiDof(
+            self._robot_id, self._joint_ids,
+            targetValues=[[x] for x in positions], targetVelocities=[[0.0]] * len(self._joint_ids)
+        )
+
+    def restart_episode(self):
+        # What the full reset does besides reloading the scene and the robot's parts, which the
+        # snapshot already holds: clear the episode counters and the robot's per-episode state
+        self.frame = 0
+        self.done = 0
+        self.reward = 0
+        self.robot.feet_contact[:] = 0.0
+        self.robot.initial_z = None
+        state = self.robot.calc_state()
+        self.potential = self.robot.calc_potential()
+        return state
+
+    def calc_feet_contact(self):
+        # One contact query for the whole robot instead of one per foot, the links touching the ground are then looked up per foot
+        ground_links = set(x[3] for x in self._p.getContactPoints(bodyA=self._robot_id) if (x[2], x[4]) in self.ground_ids)
+        for i, link in enumerate(self._foot_links):
+            # see Issue 63: https://github.com/openai/roboschool/issues/63
+            self.robot.feet_contact[i] = 1.0 if link in ground_links else 0.0
+
+    def step_repeat(self, a, repeat):
+        # Steps the same action for `repeat` frames and only observes the last one, see wrappers.ActionRepeat
+        # The progress terms telescope into the observed frame since the potential is only updated there.
+        # The alive bonus, electricity and joint limit costs of the skipped frames come from one base and one
+        # joint state query each, and a skipped frame that ends the episode becomes the observed frame.
+        a = np.asarray(a)
+        skipped = np.zeros_like(self._reward_terms)
+        for frame in range(1, repeat + 1):
+            self.robot.apply_action(a)
+            self.scene.global_step()
+            if frame == repeat:
+                break
+            terms = self.skipped_frame_rewards(a)
+            if terms[0] < 0:
+                break
+            skipped += terms
+            self.calc_feet_contact()  # the contacts the next frame's observation would hold
+
+        state, reward, done, info = self.finish_step(a)
+        self.rewards += skipped
+        reward += float(skipped.sum())
+        self.reward += float(skipped.sum())
+        info["frames"] = frame
+        return state, reward, done, info
+
+    def skipped_frame_rewards(self, a):
+        # Reward terms of a frame that step_repeat() does not observe, from the quantities calc_state() would read
+        position, orientation = self._p.getBasePositionAndOrientation(self._robot_id)
+        joints = np.array([x[:2] for x in self._p.getJointStates(self._robot_id, self._joint_ids)])
+        joint_speeds = 0.1 * joints[:, 1]
+        joints_at_limit = np.count_nonzero(np.abs(2 * (joints[:, 0] - self._joint_mid) / self._joint_range) > 0.99)
+
+        abs_a = np.abs(a)
+        terms = np.zeros_like(self._reward_terms)
+        terms[0] = self.robot.alive_bonus(position[2], self._p.getEulerFromQuaternion(orientation)[1])
+        terms[self.electricity_term] = self.electricity_cost * abs_a.dot(np.abs(joint_speeds)) / len(a)
+        terms[self.electricity_term] += self.stall_torque_cost * abs_a.dot(abs_a) / len(a)
+        terms[self.joints_at_limit_term] = self.joints_at_limit_cost * joints_at_limit
+        return terms
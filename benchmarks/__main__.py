@@ -0,0 +1,119 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+
+import numpy as np
+import torch
+
+# Imported for their benchmark registrations, in the order they run
+from . import bench_replay_buffer  # noqa: F401
+from . import bench_policies  # noqa: F401
+from . import bench_envs  # noqa: F401
+from .common import BENCHMARKS, time_op
+
+
+# Run from the repository root:
+#   python -m benchmarks run --out benchmarks/results/before.json
+#   python -m benchmarks compare benchmarks/results/before.json benchmarks/results/after.json
+
+
+def run(names, repeat, min_time):
+    results = {}
+    for name in names:
+        op, ops_per_call = BENCHMARKS[name]()
+        timings = time_op(op, ops_per_call, repeat, min_time)
+        results[name] = {
+            "median": float(np.median(timings)),
+            "min": float(timings.min()),
+            "timings": timings.tolist(),
+        }
+        print(f"{name:<50} {format_time(results[name]['median'])}")
+    return results
+
+
+def compare(base, new, threshold):
+    # Returns the names whose best time grew by more than threshold
+    # The minimum over repeats is the least sensitive to other load on the machine
+    regressions = []
+    for name in sorted(set(base) & set(new)):
+        ratio = new[name]["min"] / base[name]["min"]
+        if ratio > 1 + threshold:
+            status = "REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            status = "faster"
+        else:
+            status = ""
+        print(f"{name:<50} {format_time(base[name]['min'])} -> {format_time(new[name]['min'])}  x{ratio:.2f} {status}")
+    for name in sorted(set(base) ^ set(new)):
+        print(f"{name:<50} only in {'base' if name in base else 'new'}")
+    return regressions
+
+
+def format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.2f} ns"
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run")
+    run_parser.add_argument("--out", default="")                      # JSON file for the results, defaults to benchmarks/results/<timestamp>.json
+    run_parser.add_argument("--filter", default="")                   # Only run benchmarks whose name contains this
+    run_parser.add_argument("--repeat", default=5, type=int)          # Timed repeats per benchmark
+    run_parser.add_argument("--min_time", default=0.2, type=float)    # Minimum seconds per repeat
+    run_parser.add_argument("--threads", default=1, type=int)         # Torch threads, pinned so runs are comparable
+
+    compare_parser = subparsers.add_parser("compare")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", default=0.1, type=float)  # Relative slowdown flagged as a regression
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        torch.set_num_threads(args.threads)
+        np.random.seed(0)
+        torch.manual_seed(0)
+
+        names = [name for name in BENCHMARKS if args.filter in name]
+        results = run(names, args.repeat, args.min_time)
+
+        out = args.out or os.path.join(
+            os.path.dirname(__file__), "results", datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + ".json"
+        )
+        if os.path.dirname(out) and not os.path.exists(os.path.dirname(out)):
+            os.makedirs(os.path.dirname(out))
+        with open(out, "w") as f:
+            json.dump({
+                "meta": {
+                    "date": datetime.datetime.now().isoformat(),
+                    "machine": platform.machine(),
+                    "processor": platform.processor(),
+                    "cpu_count": os.cpu_count(),
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "torch": torch.__version__,
+                    "torch_threads": args.threads,
+                },
+                "results": results,
+            }, f, indent=2)
+        print(f"Saved {len(results)} results to {out}")
+
+    elif args.command == "compare":
+        with open(args.base) as f:
+            base = json.load(f)["results"]
+        with open(args.new) as f:
+            new = json.load(f)["results"]
+        regressions = compare(base, new, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regressions above {args.threshold:.0%}")
+            sys.exit(1)
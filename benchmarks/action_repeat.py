@@ -0,0 +1,134 @@
+import argparse
+import datetime
+import json
+import os
+import time
+
+import gym
+import numpy as np
+import torch
+
+import TD3
+import utils
+import wrappers
+from main import eval_policy
+
+
+# Returns vs wall-clock time of TD3 on the Ant for several action repeats
+# Action repeat trades policy steps for env frames, so unlike the timings in `python -m benchmarks`
+# it is judged by the return reached after a given amount of training time. Every repeat trains
+# for the same wall-clock budget, evaluation time is not counted. Run from the repository root:
+#   python -m benchmarks.action_repeat --repeats 1 2 4 --seconds 1800
+
+
+def train(env_name, repeat, seconds, eval_every, seed, start_timesteps, expl_noise, eval_episodes):
+    env = gym.make(env_name, headless=True)
+    if repeat > 1:
+        env = wrappers.ActionRepeat(env, repeat)
+    env.seed(seed)
+    env.action_space.seed(seed)
+    torch.manual_seed(seed)
+    np.random.seed(seed)
+
+    state_dim = env.observation_space.shape[0]
+    action_dim = env.action_space.shape[0]
+    max_action = float(env.action_space.high[0])
+    policy = TD3.TD3(state_dim, action_dim, max_action)
+    replay_buffer = utils.ReplayBuffer(state_dim, action_dim)
+
+    curve = []
+    elapsed = 0.
+    frames = 0
+    t = 0
+    state, done = env.reset(), False
+    episode_timesteps = 0
+    next_eval = 0.
+    while elapsed < seconds:
+        if elapsed >= next_eval:
+            curve.append({
+                "seconds": elapsed,
+                "frames": frames,
+                "policy_steps": t,
+                "return": eval_policy(policy, env_name, seed, eval_episodes, action_repeat=repeat),
+            })
+            next_eval += eval_every
+
+        start = time.perf_counter()
+        for _ in range(100):
+            episode_timesteps += 1
+            if t < start_timesteps:
+                action = env.action_space.sample()
+            else:
+                action = (
+                    policy.select_action(np.array(state))
+                    + np.random.normal(0, max_action * expl_noise, size=action_dim)
+                ).clip(-max_action, max_action)
+
+            next_state, reward, done, info = env.step(action)
+            frames += info.get("frames", 1)
+            done_bool = float(done) if episode_timesteps < env._max_episode_steps else 0
+            replay_buffer.add(state, action, next_state, reward, done_bool)
+            state = next_state
+
+            if t >= start_timesteps:
+                policy.train(replay_buffer)
+            t += 1
+
+            if done:
+                state, done = env.reset(), False
+                episode_timesteps = 0
+        elapsed += time.perf_counter() - start
+
+    curve.append({
+        "seconds": elapsed,
+        "frames": frames,
+        "policy_steps": t,
+        "return": eval_policy(policy, env_name, seed, eval_episodes, action_repeat=repeat),
+    })
+    return curve
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.action_repeat")
+    parser.add_argument("--env", default="MyAntBulletEnv-v0")            # Registered from override_ant.py if missing
+    parser.add_argument("--repeats", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--seconds", default=1800, type=float)           # Training time per repeat, evaluations excluded
+    parser.add_argument("--eval_every", default=120, type=float)         # Training seconds between evaluations
+    parser.add_argument("--eval_episodes", default=5, type=int)
+    parser.add_argument("--start_timesteps", default=10000, type=int)    # Random policy steps before training, in policy steps
+    parser.add_argument("--expl_noise", default=0.1, type=float)
+    parser.add_argument("--seed", default=0, type=int)
+    parser.add_argument("--threads", default=1, type=int)                # Torch threads, pinned so runs are comparable
+    parser.add_argument("--out", default="")                             # JSON file for the curves, defaults to benchmarks/results/
+    args = parser.parse_args()
+
+    if args.env == "MyAntBulletEnv-v0" and args.env not in gym.envs.registry.env_specs:
+        gym.envs.registration.register(
+            id="MyAntBulletEnv-v0", entry_point="override_ant:MyAntBulletEnv", max_episode_steps=1000
+        )
+    torch.set_num_threads(args.threads)
+
+    curves = {}
+    for repeat in args.repeats:
+        print("---------------------------------------")
+        print(f"Action repeat: {repeat}, training for {args.seconds:.0f} s")
+        print("---------------------------------------")
+        curves[repeat] = train(
+            args.env, repeat, args.seconds, args.eval_every, args.seed,
+            args.start_timesteps, args.expl_noise, args.eval_episodes
+        )
+
+    print(f"{'repeat':>6} {'seconds':>8} {'frames':>9} {'policy steps':>12} {'return':>9}")
+    for repeat, curve in curves.items():
+        for point in curve:
+            print(f"{repeat:>6} {point['seconds']:8.0f} {point['frames']:>9} {point['policy_steps']:>12} {point['return']:9.1f}")
+
+    out = args.out or os.path.join(
+        os.path.dirname(__file__), "results", "action_repeat_" + datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + ".json"
+    )
+    if os.path.dirname(out) and not os.path.exists(os.path.dirname(out)):
+        os.makedirs(os.path.dirname(out))
+    with open(out, "w") as f:
+        json.dump({"args": vars(args), "curves": curves}, f, indent=2)
+    print(f"Saved curves to {out}")
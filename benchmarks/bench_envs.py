@@ -0,0 +1,69 @@
+import os
+import sys
+
+import numpy as np
+
+from .common import benchmark
+
+
+# The course envs live next to the notebooks, and BattleshipGymTemplate imports battleship from there
+COURSE_MATERIAL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Course_Material")
+
+# Env steps per timed call, episodes are reset inside the loop like in main.py
+STEPS = 1000
+
+
+def step_loop(env, actions):
+    env.reset()
+    def op():
+        for action in actions:
+            _, _, done, _ = env.step(action)
+            if done:
+                env.reset()
+    return op, len(actions)
+
+
+@benchmark("MyAntBulletEnv.step")
+def ant_step():
+    from override_ant import MyAntBulletEnv
+    env = MyAntBulletEnv()
+    env.seed(0)
+    actions = np.random.uniform(-1, 1, size=(STEPS, env.action_space.shape[0])).astype(np.float32)
+    return step_loop(env, actions)
+
+
+@benchmark("MyAntMultiBulletEnv.step per robot, 8 robots")
+def ant_multi_step():
+    from override_ant_multi import MyAntMultiBulletEnv
+    env = MyAntMultiBulletEnv(n_robots=8)
+    env.seed(0)
+    env.reset()
+    actions = np.random.uniform(-1, 1, size=(STEPS // 8,) + env.action_space.shape).astype(np.float32)
+    def op():
+        for action in actions:
+            _, _, done, _ = env.step(action)
+            if done.any():
+                env.reset(np.flatnonzero(done))
+    # Timed per robot step, so it compares directly with MyAntBulletEnv.step
+    return op, actions.shape[0] * actions.shape[1]
+
+
+@benchmark("MyCartPoleEnv.step")
+def cartpole_step():
+    if COURSE_MATERIAL not in sys.path:
+        sys.path.append(COURSE_MATERIAL)
+    from MyCartPole import MyCartPoleEnv
+    env = MyCartPoleEnv()
+    env.seed(0)
+    actions = np.random.randint(0, 2, size=STEPS)
+    return step_loop(env, actions)
+
+
+@benchmark("BattleshipEnvClass.step")
+def battleship_step():
+    if COURSE_MATERIAL not in sys.path:
+        sys.path.append(COURSE_MATERIAL)
+    from BattleshipGymTemplate import BattleshipEnvClass
+    env = BattleshipEnvClass()
+    actions = np.random.randint(0, env.action_space.n, size=STEPS)
+    return step_loop(env, actions)
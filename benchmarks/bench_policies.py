@@ -0,0 +1,45 @@
+import numpy as np
+
+import DDPG
+import OurDDPG
+import TD3
+from .bench_replay_buffer import ACTION_DIM, STATE_DIM, filled_buffer
+from .common import benchmark
+
+
+POLICIES = {
+    "TD3": TD3.TD3,
+    "DDPG": DDPG.DDPG,
+    "OurDDPG": OurDDPG.DDPG,
+}
+
+# Shared between the train benchmarks, filling a large buffer is slow
+_buffers = {}
+
+
+def make_policy(name):
+    return POLICIES[name](state_dim=STATE_DIM, action_dim=ACTION_DIM, max_action=1.)
+
+
+def train_factory(name, batch_size, buffer_size=int(1e5)):
+    def factory():
+        if buffer_size not in _buffers:
+            _buffers[buffer_size] = filled_buffer(buffer_size)
+        replay_buffer = _buffers[buffer_size]
+        policy = make_policy(name)
+        return lambda: policy.train(replay_buffer, batch_size), 1
+    return factory
+
+
+def select_action_factory(name):
+    def factory():
+        policy = make_policy(name)
+        state = np.random.normal(size=STATE_DIM)
+        return lambda: policy.select_action(state), 1
+    return factory
+
+
+for name in POLICIES:
+    for batch_size in (64, 256, 1024):
+        benchmark(f"{name}.train[batch={batch_size}]")(train_factory(name, batch_size))
+    benchmark(f"{name}.select_action")(select_action_factory(name))
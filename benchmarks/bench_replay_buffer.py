@@ -0,0 +1,42 @@
+import numpy as np
+
+import utils
+from .common import benchmark
+
+
+# Ant sized transitions
+STATE_DIM = 28
+ACTION_DIM = 8
+
+
+def filled_buffer(size):
+    replay_buffer = utils.ReplayBuffer(STATE_DIM, ACTION_DIM, max_size=size)
+    replay_buffer.state[:] = np.random.normal(size=replay_buffer.state.shape)
+    replay_buffer.action[:] = np.random.uniform(-1, 1, size=replay_buffer.action.shape)
+    replay_buffer.next_state[:] = np.random.normal(size=replay_buffer.next_state.shape)
+    replay_buffer.reward[:] = np.random.normal(size=replay_buffer.reward.shape)
+    replay_buffer.not_done[:] = 1.
+    replay_buffer.size = size
+    return replay_buffer
+
+
+def add_factory(size):
+    def factory():
+        replay_buffer = utils.ReplayBuffer(STATE_DIM, ACTION_DIM, max_size=size)
+        state = np.random.normal(size=STATE_DIM)
+        action = np.random.uniform(-1, 1, size=ACTION_DIM)
+        return lambda: replay_buffer.add(state, action, state, 1., 0.), 1
+    return factory
+
+
+def sample_factory(size, batch_size):
+    def factory():
+        replay_buffer = filled_buffer(size)
+        return lambda: replay_buffer.sample(batch_size), 1
+    return factory
+
+
+for size in (int(1e4), int(1e5), int(1e6)):
+    benchmark(f"replay_buffer.add[size={size}]")(add_factory(size))
+    for batch_size in (256, 1024):
+        benchmark(f"replay_buffer.sample[size={size},batch={batch_size}]")(sample_factory(size, batch_size))
@@ -0,0 +1,38 @@
+import time
+
+import numpy as np
+
+
+# name -> function returning (op, ops_per_call)
+# The factory does all the setup, so only calls to op are timed
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(factory):
+        BENCHMARKS[name] = factory
+        return factory
+    return register
+
+
+def time_op(op, ops_per_call=1, repeat=5, min_time=0.2):
+    # Calls op in loops of at least min_time seconds, returns seconds per operation for each repeat
+    op()  # warm up caches, allocators and torch kernels
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / elapsed) + 1)
+
+    timings = [elapsed]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            op()
+        timings.append(time.perf_counter() - start)
+    return np.array(timings) / (number * ops_per_call)
@@ -0,0 +1,191 @@
+import argparse
+import glob
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import gym
+import numpy as np
+import torch
+
+import DDPG
+import OurDDPG
+import TD3
+
+
+# Renders rollouts of actors saved by main.py --save_model to mp4 files, without a display.
+# Every checkpoint is rolled out in its own worker process with the env in rgb_array mode, and the
+# worker hands the frames to a cv2.VideoWriter in a background thread, so the next frame is simulated
+# and rendered while the previous one is encoded. Run from the repository root:
+#   python export_videos.py "models/TD3_MyAntBulletEnv-v0_*_actor" --episodes 2
+
+POLICIES = {"TD3": TD3, "DDPG": DDPG, "OurDDPG": OurDDPG}
+
+# {policy}_{env}_{seed}[_{run_tag}]_actor, as written by policy.save(f"./models/{file_name}")
+MODEL_PATTERN = re.compile(r"^(?P<policy>[^_]+)_(?P<env>.+?-v\d+)_(?P<seed>\d+)(?:_(?P<tag>.+))?_actor$")
+
+# Envs of this repository that gym only knows after registration, as done in the notebooks
+ENTRY_POINTS = {
+    "MyAntBulletEnv-v0": "override_ant:MyAntBulletEnv",
+}
+
+
+class VideoEncoder(threading.Thread):
+    # Writes the frames put in its queue, the bounded queue keeps a slow encoder from piling up frames
+    def __init__(self, path, fps, max_frames=64):
+        super(VideoEncoder, self).__init__(daemon=True)
+        self.path = path
+        self.fps = fps
+        self.frames = queue.Queue(maxsize=max_frames)
+        self.error = None
+
+    def run(self):
+        import cv2
+
+        writer = None
+        try:
+            while True:
+                frame = self.frames.get()
+                if frame is None:
+                    break
+                if writer is None:
+                    height, width = frame.shape[:2]
+                    writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*"mp4v"), self.fps, (width, height))
+                writer.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+        except Exception as e:
+            self.error = e
+            # Keep draining so the rollout never blocks on a full queue
+            while self.frames.get() is not None:
+                pass
+        finally:
+            if writer is not None:
+                writer.release()
+
+    def write(self, frame):
+        self.frames.put(np.ascontiguousarray(frame[:, :, :3], dtype=np.uint8))
+
+    def close(self):
+        self.frames.put(None)
+        self.join()
+        if self.error is not None:
+            raise self.error
+
+
+def find_models(patterns):
+    # Expands globs of actor files (or the prefixes passed to policy.load) into model prefixes
+    prefixes = []
+    for pattern in patterns:
+        paths = glob.glob(pattern) or glob.glob(pattern + "_actor")
+        if not paths:
+            raise ValueError(f"No saved actor matches {pattern!r}")
+        for path in sorted(paths):
+            if path.endswith("_actor"):
+                prefixes.append(path[:-len("_actor")])
+    return prefixes
+
+
+def make_env(env_name, her=False):
+    if env_name not in gym.envs.registry.env_specs and env_name in ENTRY_POINTS:
+        gym.envs.registration.register(id=env_name, entry_point=ENTRY_POINTS[env_name], max_episode_steps=1000)
+    if her:
+        import her as her_module  # also registers MyAntGoalBulletEnv-v0
+        return her_module.GoalAntWrapper(gym.make(env_name))
+    return gym.make(env_name)
+
+
+def export(prefix, policy_name, env_name, out, episodes, seed, every, fps, width, height, max_steps, her):
+    # Runs in a worker process: one video of `episodes` consecutive episodes of the actor at prefix
+    torch.set_num_threads(1)
+    env = make_env(env_name, her)
+    env.seed(seed + 100)
+    if width and height:
+        env.unwrapped._render_width, env.unwrapped._render_height = width, height
+
+    state_dim = env.observation_space.shape[0]
+    action_dim = env.action_space.shape[0]
+    max_action = float(env.action_space.high[0])
+    actor = POLICIES[policy_name].Actor(state_dim, action_dim, max_action)
+    actor.load_state_dict(torch.load(prefix + "_actor", map_location="cpu"))
+    actor.eval()
+
+    start = time.time()
+    encoder = VideoEncoder(out, fps)
+    encoder.start()
+    returns, n_frames = [], 0
+    try:
+        for _ in range(episodes):
+            state, done = env.reset(), False
+            encoder.write(env.render("rgb_array"))
+            n_frames += 1
+            episode_return, t = 0., 0
+            while not done and t != max_steps:
+                with torch.no_grad():
+                    action = actor(torch.FloatTensor(np.asarray(state).reshape(1, -1))).numpy()[0]
+                state, reward, done, _ = env.step(action)
+                episode_return += reward
+                t += 1
+                if t % every == 0:
+                    encoder.write(env.render("rgb_array"))
+                    n_frames += 1
+            returns.append(episode_return)
+    finally:
+        encoder.close()
+        env.close()
+    return out, returns, n_frames, time.time() - start
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("models", nargs="+")                          # Saved actors, e.g. "models/TD3_MyAntBulletEnv-v0_*_actor"
+    parser.add_argument("--out_dir", default="./videos")
+    parser.add_argument("--episodes", default=1, type=int)            # Episodes per video, played one after the other
+    parser.add_argument("--max_steps", default=-1, type=int)          # Cut episodes after this many steps, -1 runs them to the end
+    parser.add_argument("--every", default=2, type=int)               # Keep every n-th frame, as the notebooks' images[::2]
+    parser.add_argument("--fps", default=30, type=float)
+    parser.add_argument("--width", default=0, type=int)               # Frame size, 0 keeps the env's render size
+    parser.add_argument("--height", default=0, type=int)
+    parser.add_argument("--seed", default=0, type=int)                # Eval env seed is seed + 100 as in main.py
+    parser.add_argument("--env", default="")                          # Env name, when it can not be read from the model file name
+    parser.add_argument("--policy", default="")                       # Policy name, when it can not be read from the model file name
+    parser.add_argument("--her", action="store_true")                 # Actors trained with main.py --her
+    parser.add_argument("--jobs", default=0, type=int)                # Worker processes, 0 uses every core
+    args = parser.parse_args()
+
+    if not os.path.exists(args.out_dir):
+        os.makedirs(args.out_dir)
+
+    jobs = []
+    for prefix in find_models(args.models):
+        match = MODEL_PATTERN.match(os.path.basename(prefix) + "_actor")
+        env_name = args.env or (match and match["env"])
+        policy_name = args.policy or (match and match["policy"])
+        if not env_name or not policy_name:
+            raise SystemExit(f"Can not tell the env and policy of {prefix}, pass --env and --policy")
+        out = os.path.join(args.out_dir, os.path.basename(prefix) + ".mp4")
+        jobs.append((prefix, policy_name, env_name, out))
+
+    failed = []
+    with ProcessPoolExecutor(max_workers=args.jobs or os.cpu_count()) as pool:
+        futures = {
+            pool.submit(
+                export, prefix, policy_name, env_name, out, args.episodes, args.seed, args.every,
+                args.fps, args.width, args.height, args.max_steps, args.her
+            ): prefix
+            for prefix, policy_name, env_name, out in jobs
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                out, returns, n_frames, elapsed = future.result()
+            except Exception as e:
+                failed.append(futures[future])
+                print(f"[{done}/{len(jobs)}] {futures[future]}: failed, {e!r}")
+                continue
+            print(f"[{done}/{len(jobs)}] {out}: {n_frames} frames in {elapsed:.1f} s, returns {', '.join(f'{r:.1f}' for r in returns)}")
+
+    if failed:
+        sys.exit(1)
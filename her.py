@@ -0,0 +1,171 @@
+import gym
+import numpy as np
+import torch
+
+import utils
+
+
+# Goal-conditioned random-points Ant and hindsight experience replay
+# Paper: https://arxiv.org/abs/1707.01495
+#
+# GoalAntWrapper draws a new walk target for every episode of override_ant_random.MyAntBulletEnv and
+# appends the target, in the robot's frame, to the observation. HERReplayBuffer stores the robot's x, y
+# and yaw with every transition, so at sample time a share of the batch is relabelled with positions the
+# robot actually reached later in the same episode: the goal dependent observation entries and the
+# progress rewards are recomputed for the whole batch at once, the rest of the reward is kept as stored.
+
+# The random-points env with the episode length of the other Ant envs
+if "MyAntGoalBulletEnv-v0" not in gym.envs.registry.env_specs:
+    gym.envs.registration.register(
+        id="MyAntGoalBulletEnv-v0", entry_point="override_ant_random:MyAntBulletEnv", max_episode_steps=1000
+    )
+
+# Observation entries of MyAnt.calc_state() that depend on the walk target
+SIN_ANGLE, COS_ANGLE = 1, 2
+# Reward terms of override_ant_random that depend on the walk target: progress and angle progress
+GOAL_TERMS = [1, 2]
+
+
+def goal_geometry(achieved, goal):
+    # achieved is (n, 3) body x, y, yaw and goal (n, 2), returns the distance and angle to the goal and
+    # the goal offset in the robot's frame, as computed by WalkerBase.calc_state()
+    offset = goal - achieved[:, :2]
+    dist = np.linalg.norm(offset, axis=1)
+    angle = np.arctan2(offset[:, 1], offset[:, 0]) - achieved[:, 2]
+    cos_yaw, sin_yaw = np.cos(achieved[:, 2]), np.sin(achieved[:, 2])
+    local = np.stack([cos_yaw * offset[:, 0] + sin_yaw * offset[:, 1], cos_yaw * offset[:, 1] - sin_yaw * offset[:, 0]], axis=1)
+    return dist, angle, local
+
+
+def goal_observation(state, achieved, goal):
+    # Replaces the goal dependent entries of a batch of goal-conditioned observations
+    _, angle, local = goal_geometry(achieved, goal)
+    state = state.copy()
+    state[:, SIN_ANGLE] = np.sin(angle)
+    state[:, COS_ANGLE] = np.cos(angle)
+    state[:, -2:] = np.clip(0.1 * local, -5, 5)
+    return state
+
+
+def goal_reward(achieved, next_achieved, goal, dt):
+    # Progress plus angle progress of override_ant_random for a batch of transitions towards goal
+    dist, angle, _ = goal_geometry(achieved, goal)
+    next_dist, next_angle, _ = goal_geometry(next_achieved, goal)
+    return (dist - next_dist) / dt + (np.cos(next_angle) - np.cos(angle)) / dt
+
+
+class GoalAntWrapper(gym.Wrapper):
+    # Walk targets are drawn on a circle around the start, as in TD3_view_random_points.ipynb
+    # info holds what HERReplayBuffer.add() needs: the body x, y, yaw before and after the step, the goal,
+    # and the part of the reward that does not depend on the goal
+    def __init__(self, env, goal_radius=np.linalg.norm([20, 20])):
+        super(GoalAntWrapper, self).__init__(env)
+        self.goal_radius = goal_radius
+        low = np.concatenate([env.observation_space.low, [-5, -5]])
+        high = np.concatenate([env.observation_space.high, [5, 5]])
+        self.observation_space = gym.spaces.Box(low, high, dtype=env.observation_space.dtype)
+        self._max_episode_steps = env._max_episode_steps  # gym wrappers do not forward private attributes
+        self.goal = np.zeros(2)
+        self.achieved = np.zeros(3)
+
+    def reset(self, **kwargs):
+        robot = self.env.unwrapped.robot
+        angle = self.env.unwrapped.np_random.uniform(0, 2 * np.pi)
+        self.goal = self.goal_radius * np.array([np.cos(angle), np.sin(angle)])
+        robot.walk_target_x, robot.walk_target_y = self.goal
+        robot.angle_to_target = None  # measure the first angle progress from the new target
+        return self.observation(self.env.reset(**kwargs))
+
+    def observation(self, state):
+        robot = self.env.unwrapped.robot
+        self.achieved = np.array([robot.body_xyz[0], robot.body_xyz[1], robot.body_rpy[2]])
+        _, _, local = goal_geometry(self.achieved[None], self.goal[None])
+        return np.concatenate([state, np.clip(0.1 * local[0], -5, 5)]).astype(state.dtype)
+
+    def step(self, action):
+        achieved = self.achieved
+        state, reward, done, info = self.env.step(action)
+        state = self.observation(state)
+
+        terms = self.env.unwrapped.rewards
+        info["achieved"] = achieved
+        info["next_achieved"] = self.achieved
+        info["goal"] = self.goal
+        info["base_reward"] = float(np.sum(terms) - np.sum(terms[GOAL_TERMS]))
+        return state, reward, done, info
+
+
+class HERReplayBuffer(utils.ReplayBuffer):
+    # relabel_prob of every batch gets a goal from the "future" strategy: the position reached at the
+    # end of a uniformly drawn later transition of the same episode
+    def __init__(self, state_dim, action_dim, max_size=int(1e6), relabel_prob=0.8, dt=0.0165):
+        super(HERReplayBuffer, self).__init__(state_dim, action_dim, max_size)
+        self.relabel_prob = relabel_prob
+        self.dt = dt  # scene.dt of the Ant envs, progress rewards are per second
+
+        self.achieved = np.zeros((max_size, 3))
+        self.next_achieved = np.zeros((max_size, 3))
+        self.goal = np.zeros((max_size, 2))
+        self.base_reward = np.zeros((max_size, 1))
+        # Index of the last transition of the episode, so far for the episode being collected
+        self.episode_end = np.zeros(max_size, dtype=np.int64)
+        self.episode_start = 0
+
+    def add(self, state, action, next_state, reward, done, info):
+        self.achieved[self.ptr] = info["achieved"]
+        self.next_achieved[self.ptr] = info["next_achieved"]
+        self.goal[self.ptr] = info["goal"]
+        self.base_reward[self.ptr] = info["base_reward"]
+        self.episode_end[self.ptr] = self.ptr
+        super(HERReplayBuffer, self).add(state, action, next_state, reward, done)
+
+    def end_episode(self):
+        # Called when the env is reset, lets earlier transitions of the episode relabel with its later ones
+        length = (self.ptr - self.episode_start) % self.max_size
+        self.episode_end[(self.episode_start + np.arange(length)) % self.max_size] = (self.ptr - 1) % self.max_size
+        self.episode_start = self.ptr
+
+    def sample(self, batch_size):
+        ind = np.random.randint(0, self.size, size=batch_size)
+
+        # Future transition of the same episode, the buffer keeps every episode in consecutive slots
+        remaining = (self.episode_end[ind] - ind) % self.max_size
+        future = (ind + (np.random.random(batch_size) * (remaining + 1)).astype(np.int64)) % self.max_size
+        relabel = np.random.random(batch_size) < self.relabel_prob
+        goal = np.where(relabel[:, None], self.next_achieved[future, :2], self.goal[ind])
+
+        achieved, next_achieved = self.achieved[ind], self.next_achieved[ind]
+        reward = np.where(
+            relabel[:, None],
+            self.base_reward[ind] + goal_reward(achieved, next_achieved, goal, self.dt)[:, None],
+            self.reward[ind]
+        )
+
+        return (
+            torch.FloatTensor(goal_observation(self.state[ind], achieved, goal)).to(self.device),
+            torch.FloatTensor(self.action[ind]).to(self.device),
+            torch.FloatTensor(goal_observation(self.next_state[ind], next_achieved, goal)).to(self.device),
+            torch.FloatTensor(reward).to(self.device),
+            torch.FloatTensor(self.not_done[ind]).to(self.device)
+        )
+
+    def save(self, filename):
+        super(HERReplayBuffer, self).save(filename)
+        np.savez(
+            filename + "_her",
+            achieved=self.achieved[:self.size],
+            next_achieved=self.next_achieved[:self.size],
+            goal=self.goal[:self.size],
+            base_reward=self.base_reward[:self.size],
+            episode_end=self.episode_end[:self.size],
+        )
+
+    def load(self, filename):
+        super(HERReplayBuffer, self).load(filename)
+        data = np.load(filename + "_her.npz")
+        self.achieved[:self.size] = data["achieved"]
+        self.next_achieved[:self.size] = data["next_achieved"]
+        self.goal[:self.size] = data["goal"]
+        self.base_reward[:self.size] = data["base_reward"]
+        self.episode_end[:self.size] = data["episode_end"]
+        self.episode_start = self.ptr
@@ -3,8 +3,13 @@ import torch
 import gym
 import argparse
 import os
+import pickle
+import shutil
 
 import utils
+import noise
+import wrappers
+import her
 import TD3
 import OurDDPG
 import DDPG
@@ -12,8 +17,12 @@ import DDPG
 
 # Runs policy for X episodes and returns average reward
 # A fixed seed is used for the eval environment
-def eval_policy(policy, env_name, seed, eval_episodes=10):
+def eval_policy(policy, env_name, seed, eval_episodes=10, action_repeat=1, goal_conditioned=False):
 	eval_env = gym.make(env_name)
+	if action_repeat > 1:
+		eval_env = wrappers.ActionRepeat(eval_env, action_repeat)
+	if goal_conditioned:
+		eval_env = her.GoalAntWrapper(eval_env)
 	eval_env.seed(seed + 100)
 
 	avg_reward = 0.
@@ -32,8 +41,82 @@ def eval_policy(policy, env_name, seed, eval_episodes=10):
 	return avg_reward
 
 
-if __name__ == "__main__":
-	
+# State of a numpy Generator or RandomState as plain data, the RNG objects gym builds do not pickle
+def get_rng_state(rng):
+	if isinstance(rng, np.random.RandomState):
+		return rng.get_state()
+	return rng.bit_generator.state
+
+
+def set_rng_state(rng, state):
+	if isinstance(rng, np.random.RandomState):
+		rng.set_state(state)
+	else:
+		rng.bit_generator.state = state
+
+
+# Saves everything needed to continue a run: networks, optimizers, replay buffer, counters and RNG states
+# RNG states cover numpy, torch, and the env and its action space when env is given; the simulator
+# state is not saved, so a resumed run starts a new episode and does not replay the same trajectory
+# Written to a temporary directory first so an interrupted save never replaces a good checkpoint
+def save_checkpoint(path, policy, replay_buffer, t, episode_num, evaluations, env=None):
+	tmp_path = path + ".tmp"
+	if os.path.exists(tmp_path):
+		shutil.rmtree(tmp_path)
+	os.makedirs(tmp_path)
+
+	policy.save(f"{tmp_path}/policy")
+	torch.save(policy.critic_target.state_dict(), f"{tmp_path}/policy_critic_target")
+	torch.save(policy.actor_target.state_dict(), f"{tmp_path}/policy_actor_target")
+	if replay_buffer is not None:
+		replay_buffer.save(f"{tmp_path}/replay_buffer")
+
+	with open(f"{tmp_path}/state.pkl", "wb") as f:
+		pickle.dump({
+			"t": t,
+			"episode_num": episode_num,
+			"evaluations": evaluations,
+			"total_it": getattr(policy, "total_it", 0),
+			"np_rng": np.random.get_state(),
+			"torch_rng": torch.get_rng_state(),
+			"env_rng": None if env is None else get_rng_state(env.unwrapped.np_random),
+			"action_space_rng": None if env is None else get_rng_state(env.action_space.np_random),
+		}, f)
+
+	if os.path.exists(path):
+		shutil.rmtree(path)
+	os.rename(tmp_path, path)
+
+
+# Restores a checkpoint written by save_checkpoint, returns the saved counters
+def load_checkpoint(path, policy, replay_buffer, env=None):
+	policy.load(f"{path}/policy")
+	policy.critic_target.load_state_dict(torch.load(f"{path}/policy_critic_target"))
+	policy.actor_target.load_state_dict(torch.load(f"{path}/policy_actor_target"))
+	if replay_buffer is not None:
+		replay_buffer.load(f"{path}/replay_buffer")
+
+	with open(f"{path}/state.pkl", "rb") as f:
+		state = pickle.load(f)
+	if hasattr(policy, "total_it"):
+		policy.total_it = state["total_it"]
+	np.random.set_state(state["np_rng"])
+	torch.set_rng_state(state["torch_rng"])
+	if env is not None and state.get("env_rng") is not None:
+		set_rng_state(env.unwrapped.np_random, state["env_rng"])
+		set_rng_state(env.action_space.np_random, state["action_space_rng"])
+	return state
+
+
+# Whether time step t ends with a checkpoint: the last step, and every checkpoint_freq steps if set
+def checkpoint_due(t, checkpoint_freq, max_timesteps):
+	if t + 1 == int(max_timesteps):
+		return True
+	return checkpoint_freq > 0 and (t + 1) % checkpoint_freq == 0
+
+
+# Arguments shared by main.py and the sweep runners
+def build_parser():
 	parser = argparse.ArgumentParser()
 	parser.add_argument("--policy", default="TD3")                  # Policy name (TD3, DDPG or OurDDPG)
 	parser.add_argument("--env", default="HalfCheetah-v2")          # OpenAI gym environment name
@@ -41,18 +124,36 @@ if __name__ == "__main__":
 	parser.add_argument("--start_timesteps", default=25e3, type=int)# Time steps initial random policy is used
 	parser.add_argument("--eval_freq", default=5e3, type=int)       # How often (time steps) we evaluate
 	parser.add_argument("--max_timesteps", default=1e6, type=int)   # Max time steps to run environment
-	parser.add_argument("--expl_noise", default=0.1)                # Std of Gaussian exploration noise
+	parser.add_argument("--expl_noise", default=0.1, type=float)    # Std of Gaussian exploration noise
 	parser.add_argument("--batch_size", default=256, type=int)      # Batch size for both actor and critic
-	parser.add_argument("--discount", default=0.99)                 # Discount factor
-	parser.add_argument("--tau", default=0.005)                     # Target network update rate
-	parser.add_argument("--policy_noise", default=0.2)              # Noise added to target policy during critic update
-	parser.add_argument("--noise_clip", default=0.5)                # Range to clip target policy noise
+	parser.add_argument("--discount", default=0.99, type=float)     # Discount factor
+	parser.add_argument("--tau", default=0.005, type=float)         # Target network update rate
+	parser.add_argument("--policy_noise", default=0.2, type=float)  # Noise added to target policy during critic update
+	parser.add_argument("--noise_clip", default=0.5, type=float)    # Range to clip target policy noise
 	parser.add_argument("--policy_freq", default=2, type=int)       # Frequency of delayed policy updates
 	parser.add_argument("--save_model", action="store_true")        # Save model and optimizer parameters
 	parser.add_argument("--load_model", default="")                 # Model load file name, "" doesn't load, "default" uses file_name
-	args = parser.parse_args()
+	parser.add_argument("--run_tag", default="")                    # Suffix for the file name, tells apart runs of the same env and seed
+	parser.add_argument("--threads", default=0, type=int)           # Torch intra-op threads, 0 keeps the torch default
+	parser.add_argument("--checkpoint", action="store_true")        # Save the full training state at the end of the run and resume from it
+	parser.add_argument("--checkpoint_freq", default=0, type=int)   # Also checkpoint every this many time steps, 0 only at max_timesteps
+	parser.add_argument("--noise", default="gaussian")              # Exploration noise: gaussian, ou or colored
+	parser.add_argument("--noise_beta", default=1.0, type=float)    # Spectrum exponent of colored noise, 1 is pink
+	parser.add_argument("--noise_block", default=4096, type=int)    # Noise samples drawn per block, colored noise uses one episode
+	parser.add_argument("--offline", default="")                    # Logged dataset (.npz or directory of .npy) to train on without env steps
+	parser.add_argument("--bc_alpha", default=None, type=float)     # TD3 behaviour cloning weight as in TD3+BC (2.5 there), unset disables it
+	parser.add_argument("--action_repeat", default=1, type=int)     # Env frames every action is held for, time steps count policy steps
+	parser.add_argument("--her", action="store_true")               # Random walk targets with hindsight relabelling, for MyAntGoalBulletEnv-v0
+	return parser
+
+
+if __name__ == "__main__":
+	
+	args = build_parser().parse_args()
 
 	file_name = f"{args.policy}_{args.env}_{args.seed}"
+	if args.run_tag != "":
+		file_name += f"_{args.run_tag}"
 	print("---------------------------------------")
 	print(f"Policy: {args.policy}, Env: {args.env}, Seed: {args.seed}")
 	print("---------------------------------------")
@@ -63,7 +164,17 @@ if __name__ == "__main__":
 	if args.save_model and not os.path.exists("./models"):
 		os.makedirs("./models")
 
+	if args.checkpoint and not os.path.exists("./checkpoints"):
+		os.makedirs("./checkpoints")
+
+	if args.threads > 0:
+		torch.set_num_threads(args.threads)
+
 	env = gym.make(args.env)
+	if args.action_repeat > 1:
+		env = wrappers.ActionRepeat(env, args.action_repeat)
+	if args.her:
+		env = her.GoalAntWrapper(env)
 
 	# Set seeds
 	env.seed(args.seed)
@@ -89,6 +200,7 @@ if __name__ == "__main__":
 		kwargs["policy_noise"] = args.policy_noise * max_action
 		kwargs["noise_clip"] = args.noise_clip * max_action
 		kwargs["policy_freq"] = args.policy_freq
+		kwargs["bc_alpha"] = args.bc_alpha
 		policy = TD3.TD3(**kwargs)
 	elif args.policy == "OurDDPG":
 		policy = OurDDPG.DDPG(**kwargs)
@@ -99,54 +211,106 @@ if __name__ == "__main__":
 		policy_file = file_name if args.load_model == "default" else args.load_model
 		policy.load(f"./models/{policy_file}")
 
-	replay_buffer = utils.ReplayBuffer(state_dim, action_dim)
-	
-	# Evaluate untrained policy
-	evaluations = [eval_policy(policy, args.env, args.seed)]
+	if args.offline != "":
+		replay_buffer = utils.ReplayBuffer.from_dataset(args.offline)
+		if replay_buffer.state.shape[1] != state_dim or replay_buffer.action.shape[1] != action_dim:
+			raise ValueError(f"Dataset {args.offline} does not match the state and action sizes of {args.env}")
+		print(f"Loaded {replay_buffer.size} transitions from {args.offline}")
+	elif args.her:
+		replay_buffer = her.HERReplayBuffer(state_dim, action_dim)
+	else:
+		replay_buffer = utils.ReplayBuffer(state_dim, action_dim)
+
+	checkpoint_path = f"./checkpoints/{file_name}"
+	if args.checkpoint and os.path.exists(checkpoint_path):
+		# Continue an earlier run, the interrupted episode is started over
+		# Offline datasets are never written, so they are not part of the checkpoint
+		checkpoint = load_checkpoint(checkpoint_path, policy, None if args.offline else replay_buffer, None if args.offline else env)
+		start_t = checkpoint["t"] + 1
+		episode_num = checkpoint["episode_num"]
+		evaluations = checkpoint["evaluations"]
+		print(f"Resuming from checkpoint at T: {start_t}")
+	else:
+		start_t = 0
+		episode_num = 0
+		# Evaluate untrained policy
+		evaluations = [eval_policy(policy, args.env, args.seed, action_repeat=args.action_repeat, goal_conditioned=args.her)]
+
+	if args.offline != "":
+		# Only gradient steps on the logged data, the env is used for evaluation alone
+		for t in range(start_t, int(args.max_timesteps)):
+			policy.train(replay_buffer, args.batch_size)
+
+			if (t + 1) % args.eval_freq == 0:
+				print(f"Total T: {t+1}")
+				evaluations.append(eval_policy(policy, args.env, args.seed, action_repeat=args.action_repeat, goal_conditioned=args.her))
+				np.save(f"./results/{file_name}", evaluations)
+				if args.save_model: policy.save(f"./models/{file_name}")
+
+			if args.checkpoint and checkpoint_due(t, args.checkpoint_freq, args.max_timesteps):
+				save_checkpoint(checkpoint_path, policy, None, t, 0, evaluations)
+
+	else:
+		# Random actions for the warmup steps are drawn in one go, same distribution as env.action_space.sample()
+		warmup_actions = np.random.uniform(
+			env.action_space.low, env.action_space.high, size=(max(0, args.start_timesteps - start_t), action_dim)
+		).astype(env.action_space.dtype)
 
-	state, done = env.reset(), False
-	episode_reward = 0
-	episode_timesteps = 0
-	episode_num = 0
+		block_size = env._max_episode_steps if args.noise == "colored" else args.noise_block
+		exploration_noise = noise.make_noise(args.noise, action_dim, max_action * args.expl_noise, block_size, args.noise_beta)
 
-	for t in range(int(args.max_timesteps)):
+		state, done = env.reset(), False
+		episode_reward = 0
+		episode_timesteps = 0
+
+		for t in range(start_t, int(args.max_timesteps)):
 		
-		episode_timesteps += 1
+			episode_timesteps += 1
 
-		# Select action randomly or according to policy
-		if t < args.start_timesteps:
-			action = env.action_space.sample()
-		else:
-			action = (
-				policy.select_action(np.array(state))
-				+ np.random.normal(0, max_action * args.expl_noise, size=action_dim)
-			).clip(-max_action, max_action)
+			# Select action randomly or according to policy
+			if t < args.start_timesteps:
+				action = warmup_actions[t - start_t]
+			else:
+				action = (
+					policy.select_action(np.array(state))
+					+ exploration_noise()
+				).clip(-max_action, max_action)
 
-		# Perform action
-		next_state, reward, done, _ = env.step(action) 
-		done_bool = float(done) if episode_timesteps < env._max_episode_steps else 0
+			# Perform action
+			next_state, reward, done, info = env.step(action) 
+			done_bool = float(done) if episode_timesteps < env._max_episode_steps else 0
 
-		# Store data in replay buffer
-		replay_buffer.add(state, action, next_state, reward, done_bool)
+			# Store data in replay buffer
+			if args.her:
+				replay_buffer.add(state, action, next_state, reward, done_bool, info)
+			else:
+				replay_buffer.add(state, action, next_state, reward, done_bool)
 
-		state = next_state
-		episode_reward += reward
+			state = next_state
+			episode_reward += reward
 
-		# Train agent after collecting sufficient data
-		if t >= args.start_timesteps:
-			policy.train(replay_buffer, args.batch_size)
+			# Train agent after collecting sufficient data
+			if t >= args.start_timesteps:
+				policy.train(replay_buffer, args.batch_size)
+
+			if done: 
+				# +1 to account for 0 indexing. +0 on ep_timesteps since it will increment +1 even if done=True
+				print(f"Total T: {t+1} Episode Num: {episode_num+1} Episode T: {episode_timesteps} Reward: {episode_reward:.3f}")
+				# Reset environment
+				if args.her: replay_buffer.end_episode()
+				state, done = env.reset(), False
+				exploration_noise.reset()
+				episode_reward = 0
+				episode_timesteps = 0
+				episode_num += 1 
+
+			# Evaluate episode
+			if (t + 1) % args.eval_freq == 0:
+				evaluations.append(eval_policy(policy, args.env, args.seed, action_repeat=args.action_repeat, goal_conditioned=args.her))
+				np.save(f"./results/{file_name}", evaluations)
+				if args.save_model: policy.save(f"./models/{file_name}")
 
-		if done: 
-			# +1 to account for 0 indexing. +0 on ep_timesteps since it will increment +1 even if done=True
-			print(f"Total T: {t+1} Episode Num: {episode_num+1} Episode T: {episode_timesteps} Reward: {episode_reward:.3f}")
-			# Reset environment
-			state, done = env.reset(), False
-			episode_reward = 0
-			episode_timesteps = 0
-			episode_num += 1 
-
-		# Evaluate episode
-		if (t + 1) % args.eval_freq == 0:
-			evaluations.append(eval_policy(policy, args.env, args.seed))
-			np.save(f"./results/{file_name}", evaluations)
-			if args.save_model: policy.save(f"./models/{file_name}")
+			# A checkpoint rewrites the whole replay buffer, so only at the end of the run
+			# (the rung budget under run_halving.py) unless --checkpoint_freq asks for more
+			if args.checkpoint and checkpoint_due(t, args.checkpoint_freq, args.max_timesteps):
+				save_checkpoint(checkpoint_path, policy, replay_buffer, t, episode_num, evaluations, env)
@@ -0,0 +1,110 @@
+import numpy as np
+
+
+# Exploration noise drawn in large blocks, so the training loop only indexes a row per step
+# instead of calling np.random for every action
+
+
+class GaussianNoise(object):
+    def __init__(self, action_dim, sigma, block_size=4096):
+        self.action_dim = action_dim
+        self.sigma = sigma
+        self.block_size = block_size
+        self._refill()
+
+    def _draw(self, n):
+        return np.random.normal(0, self.sigma, size=(n, self.action_dim))
+
+    def _refill(self):
+        self.block = self._draw(self.block_size)
+        self.i = 0
+
+    def __call__(self):
+        if self.i == len(self.block):
+            self._refill()
+        sample = self.block[self.i]
+        self.i += 1
+        return sample
+
+    def reset(self):
+        # Called at the start of every episode, white noise has no state to forget
+        pass
+
+
+class OUNoise(GaussianNoise):
+    # Ornstein-Uhlenbeck process as used for exploration in the DDPG paper
+    # x_t = x_{t-1} + theta * (mu - x_{t-1}) * dt + sigma * sqrt(dt) * N(0, 1), with mu = 0
+    def __init__(self, action_dim, sigma, theta=0.15, dt=1e-2, block_size=4096):
+        if theta * dt >= 1:
+            raise ValueError(f"OU noise needs theta * dt < 1, got {theta * dt}")
+        self.theta = theta
+        self.dt = dt
+        self.x = np.zeros(action_dim)
+        super(OUNoise, self).__init__(action_dim, sigma, block_size)
+
+    def _draw(self, n):
+        # Solves the AR(1) recursion for the whole block with cumulative sums
+        # x_k = a^k * (x_0 + sum_{j <= k} a^-j * e_j), split into chunks where a^-k stays small
+        a = 1. - self.theta * self.dt
+        e = np.random.normal(0, self.sigma * np.sqrt(self.dt), size=(n, self.action_dim))
+        chunk = n if a >= 1. else max(1, min(n, int(np.log(1e8) / -np.log(a))))
+
+        block = np.empty_like(e)
+        for start in range(0, n, chunk):
+            powers = a ** np.arange(1, min(chunk, n - start) + 1)[:, None]
+            block[start:start + chunk] = powers * (self.x + np.cumsum(e[start:start + chunk] / powers, axis=0))
+            self.x = block[min(start + chunk, n) - 1]
+        return block
+
+    def reset(self):
+        self.x = np.zeros(self.action_dim)
+        self._refill()
+
+
+class ColoredNoise(GaussianNoise):
+    # Gaussian noise with power spectral density 1/f^beta along time: 0 is white, 1 pink, 2 red
+    # One block covers a whole episode and a new one is drawn at every reset
+    # Paper: https://openreview.net/forum?id=hQ9V5QN27eS
+    def __init__(self, action_dim, sigma, beta=1., block_size=1000):
+        self.beta = beta
+        super(ColoredNoise, self).__init__(action_dim, sigma, block_size)
+
+    def _draw(self, n):
+        return self.sigma * powerlaw_psd_gaussian(self.beta, (self.action_dim, n)).T
+
+    def reset(self):
+        self._refill()
+
+
+def powerlaw_psd_gaussian(beta, size):
+    # Unit variance Gaussian samples with a 1/f^beta spectrum along the last axis
+    # Algorithm: Timmer & Koenig, "On generating power law noise", 1995
+    n = size[-1]
+    f = np.fft.rfftfreq(n)
+    scale = np.maximum(f, 1. / n) ** (-beta / 2.)
+
+    # Standard deviation of the generated signal, used to normalise to unit variance
+    w = scale[1:].copy()
+    w[-1] *= (1 + (n % 2)) / 2.
+    sigma = 2 * np.sqrt(np.sum(w ** 2)) / n
+
+    real = np.random.normal(scale=scale, size=size[:-1] + (len(f),))
+    imag = np.random.normal(scale=scale, size=size[:-1] + (len(f),))
+    # The DC and (for even n) Nyquist components of a real signal are real
+    if not n % 2:
+        imag[..., -1] = 0
+        real[..., -1] *= np.sqrt(2)
+    imag[..., 0] = 0
+    real[..., 0] *= np.sqrt(2)
+
+    return np.fft.irfft(real + 1j * imag, n=n, axis=-1) / sigma
+
+
+def make_noise(name, action_dim, sigma, block_size=4096, beta=1.):
+    if name == "gaussian":
+        return GaussianNoise(action_dim, sigma, block_size)
+    elif name == "ou":
+        return OUNoise(action_dim, sigma, block_size=block_size)
+    elif name == "colored":
+        return ColoredNoise(action_dim, sigma, beta, block_size)
+    raise ValueError(f"Unknown exploration noise {name!r}, expected gaussian, ou or colored")
@@ -0,0 +1,184 @@
+import numpy as np
+import gym
+import pybullet
+import pybullet_envs
+
+from pybullet_utils import bullet_client
+from pybullet_envs.scene_stadium import SinglePlayerStadiumScene
+
+from override_ant_random import MyAnt, MyAntBulletEnv
+
+
+# N MyAnt robots in one pybullet world, stepped together with a single global_step()
+# Every robot has its own walk target as in override_ant_random. The robots start on a grid
+# `spacing` meters apart, and walk targets are given relative to each robot's start, so
+# every robot observes exactly what it would in its own MyAntBulletEnv.
+#
+# Usage, with the transitions added to utils.ReplayBuffer in one call:
+#   env = MyAntMultiBulletEnv(n_robots=8)
+#   state = env.reset()
+#   next_state, reward, done, info = env.step(action)          # (8, 28), (8,), (8,), info
+#   replay_buffer.add_batch(state, action, next_state, reward, done & ~info["truncated"])
+#   state = env.reset(np.flatnonzero(done))                    # only the finished robots start over
+
+
+class FixedPart(object):
+    # Stands in for a BodyPart that never moves, calc_state() only reads part.pose().xyz()
+    def __init__(self, xyz):
+        self._xyz = np.array(xyz)
+
+    def pose(self):
+        return self
+
+    def xyz(self):
+        return self._xyz
+
+
+class MyAntMultiBulletEnv(gym.Env):
+
+    # Same costs as the single robot env
+    electricity_cost = MyAntBulletEnv.electricity_cost
+    stall_torque_cost = MyAntBulletEnv.stall_torque_cost
+    joints_at_limit_cost = MyAntBulletEnv.joints_at_limit_cost
+    foot_ground_object_names = MyAntBulletEnv.foot_ground_object_names
+
+    def __init__(self, n_robots=8, max_episode_steps=1000, spacing=100.):
+        self.n_robots = n_robots
+        self.max_episode_steps = max_episode_steps
+        self.robots = [MyAnt() for _ in range(n_robots)]
+
+        # Start positions on a square grid, far enough apart that the robots never meet in an episode
+        cols = int(np.ceil(np.sqrt(n_robots)))
+        self.origins = spacing * np.stack([np.arange(n_robots) % cols, np.arange(n_robots) // cols], axis=1).astype(float)
+        self.targets = np.zeros((n_robots, 2))
+        self.set_targets(np.full((n_robots, 2), 20.))  # the default target of MyAntBulletEnv
+
+        robot = self.robots[0]
+        self.single_action_space = robot.action_space
+        self.single_observation_space = robot.observation_space
+        self.action_space = gym.spaces.Box(-1., 1., shape=(n_robots,) + robot.action_space.shape, dtype=np.float32)
+        self.observation_space = gym.spaces.Box(-np.inf, np.inf, shape=(n_robots,) + robot.observation_space.shape, dtype=np.float32)
+
+        self._p = None
+        self.seed()
+
+    def seed(self, seed=None):
+        self.np_random, seed = gym.utils.seeding.np_random(seed)
+        for robot in self.robots:
+            robot.np_random = self.np_random
+        return [seed]
+
+    def set_targets(self, targets, indices=None):
+        # targets is (len(indices), 2), the walk target x, y of every robot relative to its start position
+        indices = np.arange(self.n_robots) if indices is None else indices
+        self.targets[indices] = targets
+        for i in indices:
+            self.robots[i].walk_target_x, self.robots[i].walk_target_y = self.origins[i] + self.targets[i]
+
+    def _load(self):
+        self._p = bullet_client.BulletClient()
+        self._p.resetSimulation()
+        self._p.setPhysicsEngineParameter(deterministicOverlappingPairs=1)
+        self.scene = SinglePlayerStadiumScene(self._p, gravity=9.8, timestep=0.0165 / 4, frame_skip=4)
+        self.scene.episode_restart(self._p)
+
+        for robot, origin in zip(self.robots, self.origins):
+            robot.scene = self.scene
+            robot.reset(self._p)
+            # WalkerBaseBulletEnv.reset() adds the floor to the robot's parts, and calc_state() averages the
+            # x, y of all parts including the floor at (0, 0). Each robot gets a floor at its own start instead.
+            robot.addToScene(self._p, self.scene.ground_plane_mjcf)
+            floor = robot.parts["floor"]
+            robot.parts["floor"] = FixedPart([origin[0], origin[1], 0.])
+        self.ground_ids = set([(floor.bodies[floor.bodyIndex], floor.bodyPartIndex)])
+
+        self._robot_ids = [robot.robot_body.bodies[robot.robot_body.bodyIndex] for robot in self.robots]
+        self._joint_ids = [j.jointIndex for j in robot.ordered_joints]
+        self._foot_links = [f.bodyPartIndex for f in robot.feet]
+        self._base_pose = self._p.getBasePositionAndOrientation(self._robot_ids[0])
+        self._torque_scale = robot.power * np.array([j.power_coef for j in robot.ordered_joints])
+
+        self._states = np.zeros(self.observation_space.shape, dtype=np.float32)
+        self._potentials = np.zeros(self.n_robots)
+        self._episode_steps = np.zeros(self.n_robots, dtype=int)
+        self._reward_terms = np.zeros((self.n_robots, 6))
+
+    def reset(self, indices=None):
+        # Resets every robot, or only the given ones, and returns the observations of all robots
+        if self._p is None:
+            self._load()
+        indices = range(self.n_robots) if indices is None else indices
+        positions = self.np_random.uniform(low=-0.1, high=0.1, size=(len(indices), len(self._joint_ids)))
+        for i, joint_positions in zip(indices, positions):
+            robot = self.robots[i]
+            position, orientation = self._base_pose
+            position = [position[0] + self.origins[i, 0], position[1] + self.origins[i, 1], position[2]]
+            self._p.resetBasePositionAndOrientation(self._robot_ids[i], position, orientation)
+            self._p.resetBaseVelocity(self._robot_ids[i], [0, 0, 0], [0, 0, 0])
+            self._p.resetJointStatesMultiDof(
+                self._robot_ids[i], self._joint_ids,
+                targetValues=[[x] for x in joint_positions], targetVelocities=[[0.0]] * len(self._joint_ids)
+            )
+            robot.feet_contact[:] = 0.0
+            robot.initial_z = None
+            robot.angle_to_target = None
+            self._states[i] = robot.calc_state()
+            self._potentials[i] = robot.calc_potential()
+            self._episode_steps[i] = 0
+        return self._states.copy()
+
+    def calc_feet_contact(self):
+        # One contact query for the whole world
+        touching = set((x[1], x[3]) for x in self._p.getContactPoints() if (x[2], x[4]) in self.ground_ids)
+        for robot_id, robot in zip(self._robot_ids, self.robots):
+            for k, link in enumerate(self._foot_links):
+                robot.feet_contact[k] = 1.0 if (robot_id, link) in touching else 0.0
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        # WalkerBase.apply_action() with one motor call per robot instead of one per joint
+        assert np.isfinite(actions).all()
+        torques = self._torque_scale * np.clip(actions, -1, +1)
+        for robot_id, robot_torques in zip(self._robot_ids, torques):
+            self._p.setJointMotorControlArray(robot_id, self._joint_ids, pybullet.TORQUE_CONTROL, forces=robot_torques)
+        self.scene.global_step()
+        self._episode_steps += 1
+
+        # Per robot terms of MyAntBulletEnv.step, see override_ant_random.py
+        dones = np.zeros(self.n_robots, dtype=bool)
+        for i, robot in enumerate(self.robots):
+            state = robot.calc_state()
+            self._states[i] = state
+
+            alive = float(robot.alive_bonus(state[0] + robot.initial_z, robot.body_rpy[1]))
+            dones[i] = alive < 0 or not np.isfinite(state).all()
+
+            if robot.angle_to_target is None:
+                robot.angle_to_target = np.arctan2(self.targets[i, 1], self.targets[i, 0])
+            angle_old = robot.angle_to_target
+            robot.angle_to_target = robot.walk_target_theta - robot.body_rpy[2]
+            angle_progress = (np.cos(robot.angle_to_target) - np.cos(angle_old)) / self.scene.dt
+
+            potential = robot.calc_potential()
+            progress = potential - self._potentials[i]
+            self._potentials[i] = potential
+
+            abs_a = np.abs(actions[i])
+            electricity_cost = self.electricity_cost * float(abs_a.dot(np.abs(robot.joint_speeds))) / len(abs_a)
+            electricity_cost += self.stall_torque_cost * float(abs_a.dot(abs_a)) / len(abs_a)
+            joints_at_limit_cost = float(self.joints_at_limit_cost * robot.joints_at_limit)
+
+            self._reward_terms[i] = (alive, progress, angle_progress, electricity_cost, joints_at_limit_cost, 0.0)
+
+        # After calc_state() as in MyAntBulletEnv.step, the observations hold the contacts of the previous step
+        self.calc_feet_contact()
+
+        rewards = self._reward_terms.sum(axis=1)
+        truncated = (self._episode_steps >= self.max_episode_steps) & ~dones
+        info = {"reward_terms": self._reward_terms, "truncated": truncated}
+        return self._states.copy(), rewards, dones | truncated, info
+
+    def close(self):
+        if self._p is not None:
+            self._p.disconnect()
+            self._p = None
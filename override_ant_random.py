@@ -7,6 +7,8 @@ from pybullet_envs.env_bases import MJCFBaseBulletEnv
 from pybullet_envs.robot_locomotors import Ant, WalkerBase
 from pybullet_envs.robot_bases import MJCFBasedRobot
 
+from ant_base import FastAntBulletEnv
+
 
 class MyWalkerBase(WalkerBase):
 
@@ -52,15 +54,25 @@ class MyAnt(MyWalkerBase):
         return +1 if z > 0.26 else -1  # 0.25 is central sphere rad, die if it scrapes the ground
 
 
-class MyAntBulletEnv(WalkerBaseBulletEnv):
+class MyAntBulletEnv(FastAntBulletEnv):
 
-    def __init__(self, render=False):
+    def __init__(self, render=False, headless=False, fast_reset=True, start_pool=0):
+        # headless=True skips the HUD and debug output in step() and returns the reward terms in info,
+        # e.g. gym.make("MyAntBulletEnv-v0", headless=True) for training
+        # fast_reset=True restores the simulator snapshot taken at the first reset instead of going through the full reset
+        # start_pool > 0 saves that many perturbed start states once and every reset restores one of them at random,
+        # which also skips the joint resets but limits the start states to the pool
         self.robot = MyAnt()
+        self.headless = headless
+        self.fast_reset = fast_reset
+        self.start_pool = start_pool
+        self._start_states = []
 
         self.camera_x = 0
         self.walk_target_x = 20  # originally 1 kilometer away, now 5m
         self.walk_target_y = 20
         self.stateId = -1
+        self._reward_terms = np.zeros(6)  # filled in place by step()
         MJCFBaseBulletEnv.__init__(self, self.robot, render)
 
         # WalkerBaseBulletEnv.__init__(self, self.robot, render)
@@ -71,11 +83,29 @@ class MyAntBulletEnv(WalkerBaseBulletEnv):
     foot_ground_object_names = set(["floor"])  # to distinguish ground and other objects
     joints_at_limit_cost = -0.1  # discourage stuck joints
 
+    # Reward terms are (alive, progress, angle progress, electricity, joints at limit, feet collision)
+    electricity_term = 3
+    joints_at_limit_term = 4
+
+    def restore_start_state(self):
+        if self.start_pool and not self._start_states:
+            for _ in range(self.start_pool):
+                FastAntBulletEnv.restore_start_state(self)
+                self._start_states.append(self._p.saveState())
+
+        if self._start_states:
+            self._p.restoreState(self._start_states[self.np_random.randint(len(self._start_states))])
+        else:
+            FastAntBulletEnv.restore_start_state(self)
+
     def step(self, a):
         if not self.scene.multiplayer:  # if multiplayer, action first applied to all robots, then global step() called, then _step() for all robots with the same actions
             self.robot.apply_action(a)
             self.scene.global_step()
+        return self.finish_step(a)
 
+    def finish_step(self, a):
+        # Everything step() does after the physics step: observation, reward terms and done
         state = self.robot.calc_state()  # also calculates self.joints_at_limit
 
         self._alive = float(
@@ -84,7 +114,8 @@ class MyAntBulletEnv(WalkerBaseBulletEnv):
                 self.robot.body_rpy[1]))  # state[0] is body height above ground, body_rpy[1] is pitch
         done = self._isDone()
         if not np.isfinite(state).all():
-            print("~INF~", state)
+            if not self.headless:
+                print("~INF~", state)
             done = True
 
         if self.robot.angle_to_target == None:
@@ -99,23 +130,27 @@ class MyAntBulletEnv(WalkerBaseBulletEnv):
         progress = float(self.potential - potential_old)
 
         feet_collision_cost = 0.0
-        for i, f in enumerate(
-                self.robot.feet
-        ):  # TODO: Maybe calculating feet contacts could be done within the robot code
-            contact_ids = set((x[2], x[4]) for x in f.contact_list())
-            # print("CONTACT OF '%d' WITH %d" % (contact_ids, ",".join(contact_names)) )
-            if (self.ground_ids & contact_ids):
-                # see Issue 63: https://github.com/openai/roboschool/issues/63
-                # feet_collision_cost += self.foot_collision_cost
-                self.robot.feet_contact[i] = 1.0
-            else:
-                self.robot.feet_contact[i] = 0.0
-
-        electricity_cost = self.electricity_cost * float(np.abs(a * self.robot.joint_speeds).mean(
-        ))  # let's assume we have DC motor with controller, and reverse current braking
-        electricity_cost += self.stall_torque_cost * float(np.square(a).mean())
+        self.calc_feet_contact()
+
+        # |a * speed| == |a| * |speed|, so both means are dot products
+        a = np.asarray(a)
+        abs_a = np.abs(a)
+        electricity_cost = self.electricity_cost * float(abs_a.dot(np.abs(self.robot.joint_speeds))) / len(a)
+        # let's assume we have DC motor with controller, and reverse current braking
+        electricity_cost += self.stall_torque_cost * float(abs_a.dot(abs_a)) / len(a)
 
         joints_at_limit_cost = float(self.joints_at_limit_cost * self.robot.joints_at_limit)
+
+        self.rewards = self._reward_terms
+        self.rewards[:] = (
+            self._alive, progress, angle_progress, electricity_cost, joints_at_limit_cost, feet_collision_cost
+        )
+        reward = float(self.rewards.sum())
+        self.reward += reward
+        if self.headless:
+            # The same array is refilled every step, copy it to keep the values
+            return state, reward, bool(done), {"reward_terms": self.rewards}
+
         debugmode = 0
         if (debugmode):
             print("alive=")
@@ -128,16 +163,11 @@ class MyAntBulletEnv(WalkerBaseBulletEnv):
             print(joints_at_limit_cost)
             print("feet_collision_cost")
             print(feet_collision_cost)
-
-        self.rewards = [
-            self._alive, progress, angle_progress, electricity_cost, joints_at_limit_cost, feet_collision_cost
-        ]
         if (debugmode):
             print("rewards=")
             print(self.rewards)
             print("sum rewards")
             print(sum(self.rewards))
         self.HUD(state, a, done)
-        self.reward += sum(self.rewards)
 
-        return state, sum(self.rewards), bool(done), {}
+        return state, reward, bool(done), {}
@@ -1,49 +1,12 @@
 #!/bin/bash
 
 # Script to reproduce results
-
-for ((i=0;i<10;i+=1))
-do 
-	python main.py \
-	--policy "TD3" \
-	--env "HalfCheetah-v3" \
-	--seed $i
-
-	python main.py \
-	--policy "TD3" \
-	--env "Hopper-v3" \
-	--seed $i
-
-	python main.py \
-	--policy "TD3" \
-	--env "Walker2d-v3" \
-	--seed $i
-
-	python main.py \
-	--policy "TD3" \
-	--env "Ant-v3" \
-	--seed $i
-
-	python main.py \
-	--policy "TD3" \
-	--env "Humanoid-v3" \
-	--seed $i
-
-	python main.py \
-	--policy "TD3" \
-	--env "InvertedPendulum-v2" \
-	--seed $i \
-	--start_timesteps 1000
-
-	python main.py \
-	--policy "TD3" \
-	--env "InvertedDoublePendulum-v2" \
-	--seed $i \
-	--start_timesteps 1000
-
-	python main.py \
-	--policy "TD3" \
-	--env "Reacher-v2" \
-	--seed $i \
-	--start_timesteps 1000
-done
+# Runs TD3 on every env for seeds 0-9, as many jobs at a time as there are cores.
+# Finished runs are skipped, so the script can be restarted after an interruption.
+
+python run_sweep.py \
+	--policies "TD3" \
+	--envs "HalfCheetah-v3" "Hopper-v3" "Walker2d-v3" "Ant-v3" "Humanoid-v3" \
+		"InvertedPendulum-v2" "InvertedDoublePendulum-v2" "Reacher-v2" \
+	--seeds 0 1 2 3 4 5 6 7 8 9 \
+	"$@"
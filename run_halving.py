@@ -0,0 +1,112 @@
+import argparse
+import json
+import math
+import os
+import shutil
+
+import numpy as np
+
+from main import build_parser
+from run_sweep import job_file_name, make_jobs, parse_grid, run_jobs
+
+
+# Successive halving over main.py hyperparameters
+# Paper: https://arxiv.org/abs/1502.07943
+#
+# Every config is trained to min_timesteps, scored on its latest eval_policy results,
+# and only the best 1/eta of the configs continue to eta times the budget, resuming
+# from the checkpoint main.py wrote at the end of the previous rung (its max_timesteps).
+
+
+def rung_budgets(min_timesteps, max_timesteps, eta):
+    budgets = []
+    budget = min_timesteps
+    while budget < max_timesteps:
+        budgets.append(int(budget))
+        budget *= eta
+    budgets.append(int(max_timesteps))
+    return budgets
+
+
+def config_score(jobs, eval_freq, budget, window, results_dir="./results"):
+    # Mean over seeds of the last `window` evaluations up to `budget`
+    n_evals = budget // eval_freq + 1
+    scores = []
+    for job in jobs:
+        evaluations = np.load(os.path.join(results_dir, job_file_name(job) + ".npy"))
+        scores.append(evaluations[:n_evals][-window:].mean())
+    return float(np.mean(scores))
+
+
+def remove_checkpoints(jobs):
+    for job in jobs:
+        path = f"./checkpoints/{job_file_name(job)}"
+        if os.path.exists(path):
+            shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--policy", default="TD3")                    # Policy name passed to main.py
+    parser.add_argument("--env", default="HalfCheetah-v2")            # OpenAI gym environment name
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0])  # Every config is scored on the mean over these seeds
+    parser.add_argument("--grid", nargs="+", required=True)           # Hyperparameters to sweep, e.g. tau=0.003,0.005,0.007 expl_noise=0.1,0.15
+    parser.add_argument("--min_timesteps", default=100000, type=int)  # Budget of the first rung
+    parser.add_argument("--eta", default=3, type=int)                 # Keep the best 1/eta configs at every rung
+    parser.add_argument("--score_window", default=3, type=int)        # Evaluations averaged into a config's score
+    parser.add_argument("--jobs", default=0, type=int)                # Concurrent main.py processes, 0 uses every core
+    parser.add_argument("--threads", default=0, type=int)             # Torch threads per job, 0 splits the cores evenly
+    parser.add_argument("--keep_checkpoints", action="store_true")    # Keep the checkpoints of eliminated configs
+    args, main_args = parser.parse_known_args()
+
+    # Anything not recognised above is handed to every main.py job, max_timesteps is the final rung's budget
+    main_parser = build_parser()
+    defaults = vars(main_parser.parse_args([]))
+    main_args = vars(main_parser.parse_args(main_args))
+    extra_args = {name: value for name, value in main_args.items() if value != defaults[name]}
+    extra_args["checkpoint"] = True
+
+    jobs = make_jobs([args.policy], [args.env], args.seeds, parse_grid(args.grid), extra_args)
+    configs = {}
+    for job in jobs:
+        configs.setdefault(job["run_tag"], []).append(job)
+
+    budgets = rung_budgets(args.min_timesteps, main_args["max_timesteps"], args.eta)
+    history = []
+    survivors = list(configs)
+    for rung, budget in enumerate(budgets):
+        print("---------------------------------------")
+        print(f"Rung {rung}: {len(survivors)} configs to {budget} time steps")
+        print("---------------------------------------")
+
+        rung_jobs = [dict(job, max_timesteps=budget) for tag in survivors for job in configs[tag]]
+        failed = run_jobs(rung_jobs, args.jobs, args.threads)
+        if failed:
+            print(f"Dropping configs with failed jobs, see ./results/logs: {', '.join(failed)}")
+
+        scores = {}
+        for tag in survivors:
+            if any(job_file_name(job) in failed for job in configs[tag]):
+                continue
+            scores[tag] = config_score(configs[tag], main_args["eval_freq"], budget, args.score_window)
+        ranking = sorted(scores, key=scores.get, reverse=True)
+        if not ranking:
+            raise SystemExit("Every remaining config failed")
+        for tag in ranking:
+            print(f"{tag}: {scores[tag]:.3f}")
+        history.append({"budget": budget, "scores": scores})
+
+        if rung + 1 < len(budgets):
+            survivors = ranking[:max(1, math.ceil(len(ranking) / args.eta))]
+            if not args.keep_checkpoints:
+                remove_checkpoints(job for tag in ranking[len(survivors):] for job in configs[tag])
+        else:
+            survivors = ranking[:1]
+
+    with open(f"./results/halving_{args.policy}_{args.env}.json", "w") as f:
+        json.dump({"budgets": budgets, "rungs": history, "best": survivors[0]}, f, indent=2)
+
+    print("---------------------------------------")
+    print(f"Best config: {survivors[0]}")
+    print("---------------------------------------")
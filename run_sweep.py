@@ -0,0 +1,168 @@
+import argparse
+import itertools
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+from main import build_parser
+
+
+# Runs main.py over an env x seed x hyperparameter grid, several jobs at a time.
+# Every job is its own python process, so the pool below only has to wait on them.
+# Jobs whose results file already holds every evaluation are skipped, which makes
+# re-running the same command after an interruption resume where it stopped.
+
+# Reproduces run_experiments.sh
+DEFAULT_ENVS = [
+    "HalfCheetah-v3",
+    "Hopper-v3",
+    "Walker2d-v3",
+    "Ant-v3",
+    "Humanoid-v3",
+    "InvertedPendulum-v2",
+    "InvertedDoublePendulum-v2",
+    "Reacher-v2",
+]
+
+# Per-env overrides of the main.py defaults
+ENV_ARGS = {
+    "InvertedPendulum-v2": {"start_timesteps": 1000},
+    "InvertedDoublePendulum-v2": {"start_timesteps": 1000},
+    "Reacher-v2": {"start_timesteps": 1000},
+}
+
+
+def parse_grid(items):
+    # ["tau=0.005,0.007", "batch_size=256"] -> {"tau": ["0.005", "0.007"], "batch_size": ["256"]}
+    grid = {}
+    for item in items:
+        name, _, values = item.partition("=")
+        if not values:
+            raise ValueError(f"Grid entry {item!r} should look like name=value1,value2")
+        grid[name] = values.split(",")
+    return grid
+
+
+def make_jobs(policies, envs, seeds, grid, extra_args=None):
+    names = sorted(grid)
+    jobs = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        params = dict(zip(names, values))
+        run_tag = "_".join(f"{name}{value}" for name, value in params.items())
+        for policy, env, seed in itertools.product(policies, envs, seeds):
+            job_args = {**ENV_ARGS.get(env, {}), **(extra_args or {}), **params}
+            job_args.update(policy=policy, env=env, seed=seed)
+            if run_tag != "":
+                job_args["run_tag"] = run_tag
+            jobs.append(job_args)
+    return jobs
+
+
+def job_argv(job_args):
+    argv = []
+    for name, value in job_args.items():
+        if value is True:
+            argv.append(f"--{name}")
+        elif value is not False:
+            argv.append(f"--{name}={value}")
+    return argv
+
+
+def job_file_name(job_args):
+    args = build_parser().parse_args(job_argv(job_args))
+    file_name = f"{args.policy}_{args.env}_{args.seed}"
+    if args.run_tag != "":
+        file_name += f"_{args.run_tag}"
+    return file_name
+
+
+def is_finished(job_args, results_dir="./results"):
+    # main.py evaluates once before training and then every eval_freq steps
+    args = build_parser().parse_args(job_argv(job_args))
+    path = os.path.join(results_dir, job_file_name(job_args) + ".npy")
+    if not os.path.exists(path):
+        return False
+    try:
+        evaluations = np.load(path, mmap_mode="r")
+    except ValueError:
+        # Interrupted halfway through np.save
+        return False
+    return len(evaluations) >= args.max_timesteps // args.eval_freq + 1
+
+
+def run_job(job_args, threads, log_dir="./results/logs"):
+    file_name = job_file_name(job_args)
+    env = dict(os.environ)
+    # Keep every BLAS/OpenMP pool in the child to its share of the cores
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        env[var] = str(threads)
+
+    start = time.time()
+    with open(os.path.join(log_dir, file_name + ".log"), "w") as log:
+        proc = subprocess.run(
+            [sys.executable, "main.py", *job_argv(job_args), f"--threads={threads}"],
+            stdout=log, stderr=subprocess.STDOUT, env=env,
+        )
+    return file_name, proc.returncode, time.time() - start
+
+
+def run_jobs(jobs, n_jobs=0, threads=0, results_dir="./results"):
+    n_jobs = n_jobs or os.cpu_count()
+    threads = threads or max(1, os.cpu_count() // n_jobs)
+
+    log_dir = os.path.join(results_dir, "logs")
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    pending = [job for job in jobs if not is_finished(job, results_dir)]
+    print("---------------------------------------")
+    print(f"Jobs: {len(jobs)}, already finished: {len(jobs) - len(pending)}, workers: {n_jobs}, threads per job: {threads}")
+    print("---------------------------------------")
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+        futures = [pool.submit(run_job, job, threads, log_dir) for job in pending]
+        for done, future in enumerate(as_completed(futures), 1):
+            file_name, returncode, elapsed = future.result()
+            status = "ok" if returncode == 0 else f"failed ({returncode})"
+            print(f"[{done}/{len(pending)}] {file_name}: {status} in {elapsed / 60:.1f} min")
+            if returncode != 0:
+                failed.append(file_name)
+    return failed
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--policies", nargs="+", default=["TD3"])     # Policy names passed to main.py
+    parser.add_argument("--envs", nargs="+", default=DEFAULT_ENVS)    # OpenAI gym environment names
+    parser.add_argument("--seeds", nargs="+", type=int, default=list(range(10)))
+    parser.add_argument("--grid", nargs="*", default=[])              # Hyperparameters to sweep, e.g. tau=0.005,0.007 batch_size=256,512
+    parser.add_argument("--jobs", default=0, type=int)                # Concurrent main.py processes, 0 uses every core
+    parser.add_argument("--threads", default=0, type=int)             # Torch threads per job, 0 splits the cores evenly
+    parser.add_argument("--dry_run", action="store_true")             # Only list the jobs that would run
+    args, main_args = parser.parse_known_args()
+
+    # Anything not recognised above is handed to every main.py job, e.g. --max_timesteps 300000
+    main_parser = build_parser()
+    defaults = vars(main_parser.parse_args([]))
+    extra_args = {
+        name: value for name, value in vars(main_parser.parse_args(main_args)).items()
+        if value != defaults[name]
+    }
+    jobs = make_jobs(args.policies, args.envs, args.seeds, parse_grid(args.grid), extra_args)
+
+    if args.dry_run:
+        for job in jobs:
+            status = "finished" if is_finished(job) else "pending"
+            print(f"{job_file_name(job)}: {status}")
+        sys.exit(0)
+
+    failed = run_jobs(jobs, args.jobs, args.threads)
+    if failed:
+        print(f"{len(failed)} jobs failed, see ./results/logs: {', '.join(failed)}")
+        sys.exit(1)
@@ -1,7 +1,20 @@
+import os
+
 import numpy as np
 import torch
 
 
+# File names accepted for each buffer field in logged datasets, ours first, then D4RL's
+DATASET_KEYS = {
+    "state": ("state", "observations"),
+    "action": ("action", "actions"),
+    "next_state": ("next_state", "next_observations"),
+    "reward": ("reward", "rewards"),
+    "not_done": ("not_done",),
+    "done": ("done", "terminals"),
+}
+
+
 class ReplayBuffer(object):
     def __init__(self, state_dim, action_dim, max_size=int(1e6)):
         self.max_size = max_size
@@ -13,6 +26,8 @@ class ReplayBuffer(object):
         self.next_state = np.zeros((max_size, state_dim))
         self.reward = np.zeros((max_size, 1))
         self.not_done = np.zeros((max_size, 1))
+        # Logged done flags of a from_dataset() buffer, not_done is then computed per batch
+        self.done = None
 
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
@@ -26,13 +41,93 @@ class ReplayBuffer(object):
         self.ptr = (self.ptr + 1) % self.max_size
         self.size = min(self.size + 1, self.max_size)
 
+    def add_batch(self, state, action, next_state, reward, done):
+        n = len(state)
+        ind = (self.ptr + np.arange(n)) % self.max_size
+
+        self.state[ind] = state
+        self.action[ind] = action
+        self.next_state[ind] = next_state
+        self.reward[ind] = np.reshape(reward, (n, 1))
+        self.not_done[ind] = 1. - np.reshape(done, (n, 1))
+
+        self.ptr = (self.ptr + n) % self.max_size
+        self.size = min(self.size + n, self.max_size)
+
     def sample(self, batch_size):
         ind = np.random.randint(0, self.size, size=batch_size)
+        not_done = self.not_done[ind] if self.done is None else 1. - self.done[ind]
 
         return (
             torch.FloatTensor(self.state[ind]).to(self.device),
             torch.FloatTensor(self.action[ind]).to(self.device),
             torch.FloatTensor(self.next_state[ind]).to(self.device),
             torch.FloatTensor(self.reward[ind]).to(self.device),
-            torch.FloatTensor(self.not_done[ind]).to(self.device)
+            torch.FloatTensor(not_done).to(self.device)
+        )
+
+    def save(self, filename):
+        np.savez(
+            filename,
+            state=self.state[:self.size],
+            action=self.action[:self.size],
+            next_state=self.next_state[:self.size],
+            reward=self.reward[:self.size],
+            not_done=self.not_done[:self.size],
+            ptr=self.ptr,
         )
+
+    def load(self, filename):
+        data = np.load(filename + ".npz")
+        self.size = len(data["reward"])
+        self.ptr = int(data["ptr"])
+
+        self.state[:self.size] = data["state"]
+        self.action[:self.size] = data["action"]
+        self.next_state[:self.size] = data["next_state"]
+        self.reward[:self.size] = data["reward"]
+        self.not_done[:self.size] = data["not_done"]
+
+    @classmethod
+    def from_dataset(cls, path, mmap=True):
+        # Wraps logged transitions without copying them into a new buffer
+        # path is either a .npz file or a directory of .npy files, one per field
+        # Directories are memory mapped, so datasets larger than RAM work, but the buffer is read-only
+        if os.path.isdir(path):
+            mmap_mode = "r" if mmap else None
+            files = {name[:-4]: os.path.join(path, name) for name in os.listdir(path) if name.endswith(".npy")}
+            data = {key: np.load(file, mmap_mode=mmap_mode) for key, file in files.items()}
+        else:
+            data = np.load(path)
+
+        def field(name):
+            for key in DATASET_KEYS[name]:
+                if key in data:
+                    return data[key]
+            return None
+
+        # Each field is read once, an .npz member is decompressed on every access
+        fields = {name: field(name) for name in ("state", "action", "next_state", "reward")}
+        for name, value in fields.items():
+            if value is None:
+                raise ValueError(f"Dataset {path} has no {name} field, expected one of {', '.join(DATASET_KEYS[name])}")
+        state, action, next_state, reward = (fields[name] for name in ("state", "action", "next_state", "reward"))
+
+        # done is kept as logged, a mapped terminals column is not copied into a not_done array
+        not_done, done = field("not_done"), None
+        if not_done is None:
+            done = field("done")
+            if done is None:
+                raise ValueError(f"Dataset {path} has neither not_done nor done/terminals")
+
+        replay_buffer = cls(state.shape[1], action.shape[1], max_size=0)
+        replay_buffer.state = state
+        replay_buffer.action = action
+        replay_buffer.next_state = next_state
+        replay_buffer.reward = reward.reshape(-1, 1)
+        if done is None:
+            replay_buffer.not_done = not_done.reshape(-1, 1)
+        else:
+            replay_buffer.done = done.reshape(-1, 1)
+        replay_buffer.max_size = replay_buffer.size = len(state)
+        return replay_buffer
@@ -0,0 +1,43 @@
+import gym
+
+
+# Repeats every action for `repeat` frames and returns the summed reward, so the policy acts on every
+# `repeat`-th frame. Envs with a step_repeat(action, repeat) method (the Ant envs, see ant_base.py)
+# skip the observation on the frames in between, any other env is stepped frame by frame.
+#
+# The episode length stays the same in frames: the fast path bypasses gym's TimeLimit wrapper, so the
+# frames are counted here, the last repeat is cut to the frames left, and _max_episode_steps is given in
+# policy steps for main.py.
+class ActionRepeat(gym.Wrapper):
+	def __init__(self, env, repeat):
+		super(ActionRepeat, self).__init__(env)
+		self.repeat = repeat
+		self.max_frames = env.spec.max_episode_steps if env.spec is not None else None
+		if self.max_frames is not None:
+			self._max_episode_steps = -(-self.max_frames // repeat)
+		self.fast = hasattr(env.unwrapped, "step_repeat")
+		self.frames = 0
+
+	def reset(self, **kwargs):
+		self.frames = 0
+		return self.env.reset(**kwargs)
+
+	def step(self, action):
+		repeat = self.repeat if self.max_frames is None else min(self.repeat, self.max_frames - self.frames)
+
+		if self.fast:
+			state, reward, done, info = self.env.unwrapped.step_repeat(action, repeat)
+			self.frames += info["frames"]
+		else:
+			reward = 0.
+			for _ in range(repeat):
+				state, frame_reward, done, info = self.env.step(action)
+				reward += frame_reward
+				self.frames += 1
+				if done:
+					break
+
+		if self.max_frames is not None and self.frames >= self.max_frames and not done:
+			info["TimeLimit.truncated"] = True
+			done = True
+		return state, reward, done, info